@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+
+import plotly
+
+from packed import write_atomic
+
+#Directory of the rendered pages shared by the server processes
+ARTIFACTS_PATH = os.environ.get("NS_ARTIFACTS", "./cache/artifacts")
+
+
+def write_json(path, value, cls=None):
+    '''
+    Writes value as json into path, see write_atomic
+    '''
+    write_atomic(path, json.dumps(value, cls=cls, separators=(',', ':')).encode())
+
+
+class ArtifactStore:
+    '''
+    Rendered page fragments stored as the json Dash sends to the browser, one file per fragment.
+    The store is built once by a single process, the server processes then only read the files.
+    Without a path every fragment is built in memory as before
+    '''
+    def __init__(self, path=None, writable=True):
+        self.path = path
+        self.writable = writable
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def file(self, name):
+        return os.path.join(self.path, name + ".json")
+
+    def has(self, name):
+        return name in self.pages or (self.path is not None and os.path.exists(self.file(name)))
+
+    def get(self, name, build):
+        '''
+        Returns the fragment from memory, then from its file, and otherwise from build()
+        '''
+        if name in self.pages:
+            return self.pages[name]
+        page = None
+        if self.path is not None:
+            try:
+                with open(self.file(name)) as file:
+                    page = json.load(file)
+            except (OSError, ValueError):
+                pass
+        if page is None:
+            page = build()
+            if self.path is not None and self.writable:
+                self.save(name, page)
+        with self.lock:
+            self.pages[name] = page
+        return page
+
+    def save(self, name, page):
+        os.makedirs(self.path, exist_ok=True)
+        write_json(self.file(name), page, plotly.utils.PlotlyJSONEncoder)
@@ -0,0 +1,352 @@
+import argparse
+import cProfile
+import datetime
+import json
+import os
+import platform
+import pstats
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+import preprocess
+
+
+def time_it(func, *args, **kwargs):
+    start = time.perf_counter()
+    output = func(*args, **kwargs)
+    return output, time.perf_counter() - start
+
+
+def legacy_year_edges(faculty, names, year):
+    '''
+    The edge building loop Year used before the author index: list membership and two has_edge per author
+    '''
+    import networkx as nx
+
+    graph_year = nx.Graph()
+    graph_previous_years = nx.Graph()
+    for x in faculty:
+        for paper in faculty[x].papers:
+            if (paper.year <= year) and (paper.year > 1999):
+                for author in paper.authors:
+                    if (author in names) and (author != x) and not(graph_previous_years.has_edge(x, author)) and not(graph_previous_years.has_edge(author, x)):
+                        graph_previous_years.add_edge(x, author)
+                        if paper.year == year:
+                            graph_year.add_edge(x, author)
+    return graph_year, graph_previous_years
+
+
+def benchmark_edges(repeat):
+    '''
+    Times building the edges of every year from 2000 to 2021 with the legacy loop and with YearSweep
+    '''
+    import faculty
+
+    def legacy():
+        for year in range(2000, 2022):
+            legacy_year_edges(faculty.FACULTY, faculty.NAMES, year)
+
+    def sweep():
+        s = faculty.YearSweep()
+        for year in range(2000, 2022):
+            s.graph_year(year)
+            s.graph_previous_years(year)
+
+    for name, func in (("legacy loop", legacy), ("author index", sweep)):
+        best = min(time_it(func)[1] for _ in range(repeat))
+        print(f"{name:>14}: {best:.4f} s for 2000-2021 (best of {repeat})")
+
+
+def profile_startup(top):
+    '''
+    Profiles the startup and the graph builders behind the pages, and reports the calls to pandas read_csv in them
+    '''
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    import faculty
+    for year in range(2000, 2022):
+        faculty.Year(year, lazy=True)
+    faculty.FacultySubset(faculty.NAMES[:5])
+    faculty.FacultySubset({i: 'blue' for i in faculty.NAMES})
+
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+
+    calls, seconds = 0, 0.0
+    for (filename, line, name), (cc, nc, tt, ct, callers) in stats.stats.items():
+        if name == "read_csv":
+            calls += nc
+            seconds += ct
+    print(f"read_csv: {calls} calls, {seconds:.3f} s")
+    stats.sort_stats("cumulative").print_stats(top)
+
+
+def benchmark_ingestion(workers, chunksize):
+    '''
+    Times fetch_faculty and get_people on the real corpus for every worker count, the on-disk cache is left out
+    '''
+    print(f"{'Workers':>8} {'Data (s)':>10} {'AdditionalData (s)':>20}")
+    for n in workers:
+        preprocess.FACULTY_PID.clear()
+        preprocess.ADDITIONAL_NAMES.clear()
+        preprocess.CACHE_PATH = ""
+        preprocess.CACHES.clear()
+        _, t_faculty = time_it(preprocess.fetch_faculty, n, chunksize)
+        _, t_people = time_it(preprocess.get_people, n, chunksize)
+        print(f"{n:>8} {t_faculty:>10.2f} {t_people:>20.2f}")
+
+
+def import_times(module):
+    '''
+    Imports the module in a new interpreter with -X importtime.
+    Returns the cumulative time of every module in seconds, or None if the import failed or loaded the corpus
+    '''
+    check = f"import {module}, faculty; assert not faculty.DATA.loaded, 'the import loaded the corpus'"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+        return None
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def benchmark_import(modules, budget):
+    '''
+    Import time of the modules of the project, an import over budget seconds or one that loads the corpus is a failure
+    '''
+    failed = False
+    print(f"{'Module':>12} {'Import (s)':>11}")
+    for module in modules:
+        times = import_times(module)
+        if times is None:
+            print(f"{module:>12} {'failed':>11}")
+            failed = True
+            continue
+        print(f"{module:>12} {times[module]:>11.3f}")
+        if budget is not None and times[module] > budget:
+            print(f"{module} takes more than {budget} s to import")
+            failed = True
+    return not failed
+
+
+def copy_tag(copy):
+    '''
+    Letters that mark the copy, the digits of author names are dropped when they are read
+    '''
+    tag = ""
+    while copy:
+        copy, r = divmod(copy, 26)
+        tag = chr(ord('A') + r) + tag
+    return tag
+
+
+def copy_person(source, target, tag):
+    '''
+    Writes the dblp file of a person with every pid and every author renamed for the copy
+    '''
+    with open(source, encoding="utf-8") as file:
+        text = file.read()
+    text = re.sub(r'pid="([^"]*)"', lambda m: f'pid="{m.group(1)}-{tag}"', text)
+    text = re.sub(r'(<author\b[^>]*>)([^<]*)(</author>)', lambda m: f"{m.group(1)}{m.group(2)} {tag}{m.group(3)}", text)
+    with open(target, 'w', encoding="utf-8") as file:
+        file.write(text)
+
+
+def synthesize(scale, path, additional=False):
+    '''
+    Writes under path a corpus scale times the bundled one: every faculty is copied scale times with new names and pids,
+    so the copies form disjoint networks of the same shape. AdditionalData is only scaled with additional, otherwise it is linked
+    '''
+    if os.path.exists(os.path.join(path, "Faculty.csv")):
+        return path
+    os.makedirs(os.path.join(path, "Data"), exist_ok=True)
+    shutil.copy("Additional.csv", path)
+
+    df = preprocess.FACULTY_DF
+    copies = [df]
+    for copy in range(1, scale):
+        tag = copy_tag(copy)
+        for name in preprocess.NAMES:
+            copy_person(f"./Data/{name}.xml", os.path.join(path, "Data", f"{name} {tag}.xml"), tag)
+        copies.append(df.assign(Faculty=df['Faculty'] + f" {tag}"))
+    for name in preprocess.NAMES:
+        shutil.copy(f"./Data/{name}.xml", os.path.join(path, "Data"))
+    preprocess.pd.concat(copies).to_csv(os.path.join(path, "Faculty.csv"), index=False)
+
+    if not additional:
+        os.symlink(os.path.abspath("AdditionalData"), os.path.join(path, "AdditionalData"))
+        return path
+    os.makedirs(os.path.join(path, "AdditionalData"))
+    for name in os.listdir("AdditionalData"):
+        shutil.copy(os.path.join("AdditionalData", name), os.path.join(path, "AdditionalData"))
+        for copy in range(1, scale):
+            tag = copy_tag(copy)
+            copy_person(os.path.join("AdditionalData", name), os.path.join(path, "AdditionalData", f"{name[:-4]} {tag}.xml"), tag)
+    return path
+
+
+def suite_stages(approximate):
+    '''
+    Stages of the suite as name: (setup, stage), setup is not timed and its output is given to stage
+    '''
+    def no_cache():
+        preprocess.CACHE_PATH = ""
+        preprocess.CACHES.clear()
+
+    def warm_cache():
+        preprocess.fetch_faculty()
+        preprocess.CACHES.clear()
+        preprocess.FACULTY_PID.clear()
+
+    def data():
+        import faculty
+        faculty.DATA.load()
+        return faculty
+
+    def years():
+        faculty = data()
+        return {i: faculty.Year(i, lazy=True, approximate=approximate) for i in range(2000, 2022)}
+
+    def loaded_year():
+        faculty = data()
+        return faculty.Year(2015, approximate=approximate)
+
+    def interface():
+        data()
+        import interface
+        interface.get_groups()
+        return interface
+
+    def subsets(faculty):
+        faculty.FacultySubset({i: 'blue' for i in faculty.DATA.names})
+        faculty.FacultySubset(faculty.DATA.names[:20], year=2015)
+
+    def hire():
+        import faculty
+        return faculty.Hire(approximate)
+
+    def page_year(year):
+        import interface
+        interface.buildYearContent(year)
+
+    return {
+        'ingest_cold': (no_cache, lambda _: preprocess.fetch_faculty()),
+        'ingest_warm': (warm_cache, lambda _: preprocess.fetch_faculty()),
+        'people_cold': (no_cache, lambda _: preprocess.get_people()),
+        'year_build': (data, lambda faculty: [faculty.Year(i, lazy=True) for i in range(2000, 2022)]),
+        'year_metrics': (years, lambda years: [i.load() for i in years.values()]),
+        'subset': (data, subsets),
+        'hire': (preprocess.getHireCorpus, lambda _: hire()),
+        'page_year': (loaded_year, page_year),
+        'page_ranks': (interface, lambda interface: interface.rankContent(2015)),
+        'page_hire': (preprocess.getHireCorpus, lambda _: __import__("interface").hireContent()),
+    }
+
+
+def run_stage(name, approximate):
+    '''
+    Runs one stage in this process and prints its wall time and memory as json.
+    The peak is the growth of the maximum resident size over the stage, total is the maximum of the process
+    '''
+    setup, stage = suite_stages(approximate)[name]
+    state = setup()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    stage(state)
+    seconds = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'peak_mb': (after - before) / 1024, 'total_mb': after / 1024}))
+
+
+def benchmark_suite(scales, stages, output, path, additional=False, pivots=None, compare=None):
+    '''
+    Runs every stage on the bundled corpus and on the synthetic ones, each stage in a new process with its own caches,
+    and writes the results to output as json
+    '''
+    repo = os.path.dirname(os.path.abspath(__file__))
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=repo).stdout.strip()
+    results = []
+    print(f"{'Scale':>6} {'Stage':>14} {'Time (s)':>10} {'Peak (MB)':>10} {'Total (MB)':>11}")
+    for scale in scales:
+        cwd = repo if scale == 1 else synthesize(scale, os.path.join(path, f"x{scale}" + ("-all" if additional else "")), additional)
+        for stage in stages:
+            command = [sys.executable, os.path.join(repo, "benchmark.py"), "--run-stage", stage]
+            if pivots is not None:
+                command += ["--pivots", str(pivots)]
+            #The element lists are kept in memory only so that the pages are really built
+            result = subprocess.run(command, capture_output=True, text=True, cwd=cwd, env=dict(os.environ, NS_ELEMENTS=""))
+            if result.returncode != 0:
+                print(f"{scale:>6} {stage:>14} failed: {result.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(result.stdout.strip().splitlines()[-1])
+            r.update(scale=scale, stage=stage)
+            results.append(r)
+            print(f"{scale:>6} {stage:>14} {r['seconds']:>10.2f} {r['peak_mb']:>10.1f} {r['total_mb']:>11.1f}")
+
+    report = {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(), 'cpus': os.cpu_count(), 'pivots': pivots, 'results': results}
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+
+    if compare:
+        with open(compare) as file:
+            old = {(i['scale'], i['stage']): i for i in json.load(file)['results']}
+        print(f"{'Scale':>6} {'Stage':>14} {'Before (s)':>11} {'After (s)':>10} {'Ratio':>6}")
+        for r in results:
+            if (r['scale'], r['stage']) in old:
+                before = old[(r['scale'], r['stage'])]['seconds']
+                print(f"{r['scale']:>6} {r['stage']:>14} {before:>11.2f} {r['seconds']:>10.2f} {r['seconds'] / before:>6.2f}")
+
+
+SUITE_STAGES = ['ingest_cold', 'ingest_warm', 'people_cold', 'year_build', 'year_metrics', 'subset',
+                'hire', 'page_year', 'page_ranks', 'page_hire']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the expensive stages of the project")
+    parser.add_argument("stages", nargs="*", default=["ingest"], help="ingest, edges, profile, import, suite")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument("--chunksize", type=int, default=preprocess.CHUNKSIZE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="number of functions shown by profile")
+    parser.add_argument("--budget", type=float, default=None, help="import fails above this many seconds")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="sizes of the corpora of the suite, 1 is the bundled one")
+    parser.add_argument("--suite-stages", nargs="+", default=SUITE_STAGES, choices=SUITE_STAGES)
+    parser.add_argument("--synthetic", default="./cache/synthetic", help="directory of the synthetic corpora")
+    parser.add_argument("--scale-additional", action="store_true", help="also scale AdditionalData, it is large")
+    parser.add_argument("--pivots", type=int, default=None, help="sample the betweenness and closeness from this many pivots")
+    parser.add_argument("--output", default=None, help="json file of the suite, by default cache/benchmarks/<commit>.json")
+    parser.add_argument("--compare", default=None, help="json file of an earlier suite to compare with")
+    parser.add_argument("--run-stage", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    approximate = None if args.pivots is None else {'k': args.pivots, 'seed': 0}
+    if args.run_stage:
+        run_stage(args.run_stage, approximate)
+        sys.exit(0)
+
+    if "ingest" in args.stages:
+        benchmark_ingestion(args.workers, args.chunksize)
+    if "edges" in args.stages:
+        benchmark_edges(args.repeat)
+    if "profile" in args.stages:
+        profile_startup(args.top)
+    if "import" in args.stages:
+        if not benchmark_import(["preprocess", "faculty", "elements", "interface", "project"], args.budget):
+            sys.exit(1)
+    if "suite" in args.stages:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+        output = args.output or f"./cache/benchmarks/{commit or 'results'}.json"
+        benchmark_suite(args.scales, args.suite_stages, output, args.synthetic, args.scale_additional, args.pivots, args.compare)
@@ -0,0 +1,211 @@
+import numpy as np
+
+PAPER_TYPES = {None: 0, "journal": 1, "conference": 2}
+
+
+class Corpus:
+    '''
+    Columnar store of the papers read from a set of dblp person files.
+    Every row is a paper as listed in the file of its owner, authors are integer ids and the
+    authors of row r are indices[indptr[r]:indptr[r+1]]
+    '''
+
+    def __init__(self):
+        self.author_names = []
+        self.author_ids = {}
+
+        self.venue_names = []
+        self.venue_ids = {}
+
+        self.owner = []
+        self.year = []
+        self.paper_type = []
+        self.venue = []
+
+        self.indptr = [0]
+        self.indices = []
+
+    def intern(self, name):
+        '''
+        Returns the id of the author, a new id is given to names that were not seen before
+        '''
+        i = self.author_ids.get(name)
+        if i is None:
+            i = len(self.author_names)
+            self.author_ids[name] = i
+            self.author_names.append(name)
+        return i
+
+    def intern_venue(self, venue):
+        if venue is None:
+            return -1
+        i = self.venue_ids.get(venue)
+        if i is None:
+            i = len(self.venue_names)
+            self.venue_ids[venue] = i
+            self.venue_names.append(venue)
+        return i
+
+    def add_paper(self, owner, year, paper_type, venue, authors):
+        self.owner.append(self.intern(owner))
+        self.year.append(year)
+        self.paper_type.append(PAPER_TYPES[paper_type])
+        self.venue.append(self.intern_venue(venue))
+        for name in authors:
+            self.indices.append(self.intern(name))
+        self.indptr.append(len(self.indices))
+
+    def finalize(self):
+        '''
+        Converts the columns to numpy arrays once every paper has been added
+        '''
+        self.owner = np.array(self.owner, dtype=np.int32)
+        self.year = np.array(self.year, dtype=np.int16)
+        self.paper_type = np.array(self.paper_type, dtype=np.int8)
+        self.venue = np.array(self.venue, dtype=np.int32)
+        self.indptr = np.array(self.indptr, dtype=np.int64)
+        self.indices = np.array(self.indices, dtype=np.int32)
+
+        #Rows sorted by owner so that the papers of an owner are found with a binary search
+        self.owner_order = np.argsort(self.owner, kind='stable')
+        self.owner_sorted = self.owner[self.owner_order]
+        return self
+
+    def __len__(self):
+        return len(self.year)
+
+    def nbytes(self):
+        return sum(i.nbytes for i in (self.owner, self.year, self.paper_type, self.venue,
+                                       self.indptr, self.indices))
+
+    def ids(self, names):
+        '''
+        Returns the ids of the names that appear in the corpus
+        '''
+        return np.array([self.author_ids[i] for i in names if i in self.author_ids], dtype=np.int32)
+
+    def names(self, ids):
+        return [self.author_names[i] for i in ids]
+
+    def member_mask(self, names):
+        '''
+        Boolean array over the author ids, True for the given names
+        '''
+        mask = np.zeros(len(self.author_names), dtype=bool)
+        mask[self.ids(names)] = True
+        return mask
+
+    def venue_mask(self, venues):
+        '''
+        Boolean array over the rows, True for the papers published in one of the venues
+        '''
+        ids = [self.venue_ids[i] for i in venues if i in self.venue_ids]
+        return np.isin(self.venue, ids)
+
+    def rows(self, owners=None, start=None, end=None, year=None):
+        '''
+        Indices of the rows, in order, owned by one of the owners and published in [start, end] or in year
+        '''
+        mask = np.ones(len(self), dtype=bool)
+        if owners is not None:
+            mask &= np.isin(self.owner, self.ids(owners))
+        if start is not None:
+            mask &= self.year >= start
+        if end is not None:
+            mask &= self.year <= end
+        if year is not None:
+            mask &= self.year == year
+        return np.flatnonzero(mask)
+
+    def owner_rows(self, owners):
+        '''
+        Indices of the rows of every owner, grouped in the order of owners and in file order within an owner
+        '''
+        out = []
+        for i in self.ids(owners):
+            low, high = np.searchsorted(self.owner_sorted, [i, i + 1])
+            out.append(self.owner_order[low:high])
+        if not out:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(out)
+
+    def authorships(self, rows):
+        '''
+        Expands the rows to one entry per (paper, author) keeping the order of the rows and of the authors.
+        Returns the row, the owner and the author of every entry
+        '''
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = self.indptr[rows + 1] - self.indptr[rows]
+        row = np.repeat(rows, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        author = self.indices[self.indptr[row] + offsets]
+        return row, self.owner[row], author
+
+
+def first_pairs(source, target):
+    '''
+    Index of the first occurrence of every undirected pair, in the order they first appear
+    '''
+    if len(source) == 0:
+        return np.zeros(0, dtype=np.int64)
+    low = np.minimum(source, target).astype(np.int64)
+    high = np.maximum(source, target).astype(np.int64)
+    _, first = np.unique(low * (int(high.max()) + 1) + high, return_index=True)
+    return np.sort(first)
+
+
+class Excellence:
+    '''
+    Rule scoring the owners of a Corpus by their papers in a set of venues published in [start, end].
+    venues is a list of venue names or a dict with the weight of each venue. An owner is excellent once the score
+    reaches threshold. Only the owner, venue and year columns are read, so a rule with other parameters
+    scores the same corpus again without reading the files
+    '''
+
+    def __init__(self, venues, start=None, end=None, threshold=None):
+        self.venues = dict(venues) if isinstance(venues, dict) else dict.fromkeys(venues, 1)
+        self.start = start
+        self.end = end
+        self.threshold = threshold
+
+    def __repr__(self):
+        return f"Excellence({len(self.venues)} venues, start={self.start}, end={self.end}, threshold={self.threshold})"
+
+    def paper_weights(self, corpus):
+        '''
+        Weight of every row, 0 for the papers outside the venues or the years
+        '''
+        #Row venue -1 (no conference) maps to the first slot of the table
+        table = np.zeros(len(corpus.venue_names) + 1)
+        for venue, weight in self.venues.items():
+            if venue in corpus.venue_ids:
+                table[corpus.venue_ids[venue] + 1] = weight
+        weights = table[corpus.venue + 1]
+        if self.start is not None:
+            weights[corpus.year < self.start] = 0
+        if self.end is not None:
+            weights[corpus.year > self.end] = 0
+        return weights
+
+    def scores(self, corpus):
+        '''
+        Score of every author id in a single bincount, 0 for the ids that own no paper.
+        The scores are counts of papers as long as every weight is a whole number
+        '''
+        scores = np.bincount(corpus.owner, weights=self.paper_weights(corpus), minlength=len(corpus.author_names))
+        if all(float(i).is_integer() for i in self.venues.values()):
+            return scores.astype(np.int64)
+        return scores
+
+    def excellent(self, corpus):
+        '''
+        Boolean array over the author ids, True for the owners whose score reaches the threshold
+        '''
+        return self.scores(corpus) >= self.threshold
+
+    def owner_scores(self, corpus, owners):
+        '''
+        Score of every owner by name
+        '''
+        scores = self.scores(corpus)
+        return {i: scores[corpus.author_ids[i]].item() if i in corpus.author_ids else 0 for i in owners}
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+from artifacts import write_json
+from faculty import LRUCache
+
+#Directory of the element lists, an empty value keeps them in memory only
+ELEMENTS_PATH = os.environ.get("NS_ELEMENTS", "./cache/elements")
+
+#Bumped whenever the content of the elements changes, for instance with a new layout, so that older files are not used
+FORMAT = 3
+
+#spring_layout positions are in [-scale, scale], cytoscape expects pixels
+POSITION_SCALE = 150
+
+
+def graph_elements(G, nodes_data=None, size_by='degree', node_size=5, edge_size=0.3):
+    '''
+    Converts the networkx graph to the list of cytoscape elements.
+    Nodes with a 'pos' attribute get their position so the browser does not have to lay them out from scratch
+    '''
+    nodes = []
+    for node in G.nodes():
+        temp = {'id': node, 'label': node}
+        if nodes_data != None:
+            for i in nodes_data:
+                if i == 'size':
+                    if G.nodes[node][size_by] < 1000:
+                        temp[i] = f"{G.nodes[node][size_by] * node_size + node_size}%"
+                    else:
+                        temp[i] = f"15%"
+                else:
+                    temp[i] = G.nodes[node][i]
+        element = {'data': temp}
+        if 'pos' in G.nodes[node]:
+            x, y = G.nodes[node]['pos']
+            element['position'] = {'x': float(x) * POSITION_SCALE, 'y': float(y) * POSITION_SCALE}
+        nodes.append(element)
+
+    edges = []
+    for edge in G.edges():
+        edges.append({
+            'data': {'source': edge[0], 'target': edge[1], 'edge_size': edge_size}
+        })
+    return edges + nodes
+
+
+def has_positions(elements):
+    return any('position' in i for i in elements)
+
+
+class ElementStore:
+    '''
+    Element lists kept in memory and as json files under path.
+    The keys identify the data a graph was built from, version identifies the corpus for the keys that depend on all of it
+    '''
+    def __init__(self, version, path=ELEMENTS_PATH, maxsize=256):
+        self.version = version
+        self.path = os.path.join(path, f"v{FORMAT}") if path else None
+        self.memory = LRUCache(maxsize)
+        self.disk_hits = 0
+
+    def file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest()[:20] + ".json")
+
+    def get(self, key, build):
+        '''
+        Returns the elements of key, from memory, then from disk, and otherwise from build()
+        '''
+        return self.memory.get(key, lambda: self.load(key, build))
+
+    def load(self, key, build):
+        if self.path:
+            try:
+                with open(self.file(key)) as file:
+                    elements = json.load(file)
+                self.disk_hits += 1
+                return elements
+            except (OSError, ValueError):
+                pass
+
+        elements = build()
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            write_json(self.file(key), elements)
+        return elements
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        return stats
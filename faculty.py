@@ -1,57 +1,418 @@
 import csv
+import hashlib
+import heapq
+import math
 import operator
+import random
+import threading
+from collections import OrderedDict
+from functools import partial
 
 import networkx as nx
-import matplotlib.pyplot as plt
 import numpy
-import pandas as pd
 
-from preprocess import fetch_faculty, getHire
+from corpus import first_pairs
+from preprocess import load_faculty, getHireCorpus, parallel_map, FACULTY_LIST, PERSON_EXCELLENCE
 from tqdm import tqdm
 
-FACULTY, NAMES = fetch_faculty()
+class AuthorIndex:
+
+    '''
+    Dense integer ids for the authors of the corpus with O(1) membership tests for a set of members,
+    either by name or through a boolean mask over the ids
+    '''
+
+    def __init__(self, corpus, members):
+        self.corpus = corpus
+        self.members = frozenset(members)
+        self.mask = corpus.member_mask(members)
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def __getitem__(self, ids):
+        return self.mask[ids]
+
+    def id(self, name):
+        return self.corpus.author_ids[name]
+
+    def name(self, i):
+        return self.corpus.author_names[i]
+
+    def names(self, ids):
+        return self.corpus.names(ids)
+
+    def pair_key(self, a, b):
+        '''
+        Single integer for the undirected pair of ids
+        '''
+        if a > b:
+            a, b = b, a
+        return a * len(self.corpus.author_names) + b
+
+class Context:
+
+    '''
+    The SCSE data every graph is built from: the Faculty of load_faculty, their names, their Corpus and its AuthorIndex.
+    Nothing is read before one of them is used, importing the module stays cheap
+    '''
+
+    FIELDS = ('faculty', 'names', 'corpus', 'scse')
+
+    def __init__(self, workers=None, chunksize=None):
+        self.workers = workers
+        self.chunksize = chunksize
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def load(self):
+        with self.lock:
+            if not self.loaded:
+                self.faculty, self.names, self.corpus = load_faculty(self.workers, self.chunksize, papers=False)
+                self.scse = AuthorIndex(self.corpus, self.names)
+                self.loaded = True
+        return self
+
+    def __getattr__(self, name):
+        #Only called for the fields that are not set yet
+        if name in Context.FIELDS:
+            self.load()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+DATA = Context()
+
+#Module attributes the data had when it was loaded on import, they now load DATA when read
+MODULE_DATA = {'FACULTY': 'faculty', 'NAMES': 'names', 'CORPUS': 'corpus', 'SCSE': 'scse'}
+
+def __getattr__(name):
+    if name in MODULE_DATA:
+        return getattr(DATA, MODULE_DATA[name])
+    raise AttributeError(f"module 'faculty' has no attribute '{name}'")
+
+def edge_digest(previous, edges):
+    '''
+    Chains the digest of the years before with the edges of a year, the order and direction of the edges do not matter
+    '''
+    edges = sorted(tuple(sorted(i)) for i in edges)
+    return hashlib.sha1((previous + repr(edges)).encode()).hexdigest()
+
+class YearSweep:
+
+    '''
+    Sweeps the SCSE papers once in year order and keeps the edges of every yearly and cumulative graph.
+    The cumulative graphs share one list of edges, the cumulative graph of a year is its prefix up to the offset of the year.
+    The digest of a year identifies its graph and the ones of the years before, the layout of a year depends on them
+    '''
+
+    def __init__(self, start=2000, end=2021):
+        self.year_edges = {}
+        self.cumulative_edges = []
+        self.offsets = {}
+        self.seen = set()
+        self.base = hashlib.sha1(repr(sorted(DATA.names)).encode()).hexdigest()
+        self.digests = {}
+
+        row, owner, author = DATA.corpus.authorships(DATA.corpus.rows(start=start, end=end))
+        keep = DATA.scse[author] & (author != owner)
+        row, owner, author = row[keep], owner[keep], author[keep]
+
+        order = numpy.argsort(DATA.corpus.year[row], kind='stable')
+        years, owner, author = DATA.corpus.year[row][order], owner[order], author[order]
+        for year in range(start, end + 1):
+            low, high = numpy.searchsorted(years, [year, year + 1])
+            self.add_year(year, owner[low:high], author[low:high])
+
+    def add_year(self, year, owner, author):
+        '''
+        Adds a year from the authorships of its papers, the cost only depends on the papers of that year
+        '''
+        edges = []
+        offset = len(self.cumulative_edges)
+        scse = DATA.scse
+        first = first_pairs(owner, author)
+        for a, b in zip(owner[first].tolist(), author[first].tolist()):
+            edge = (scse.name(a), scse.name(b))
+            edges.append(edge)
+            key = scse.pair_key(a, b)
+            if key not in self.seen:
+                self.seen.add(key)
+                self.cumulative_edges.append(edge)
+        self.year_edges[year] = edges
+        self.offsets[year] = len(self.cumulative_edges)
+
+        previous = self.digests.get(year - 1, {'year': self.base, 'cumulative': self.base})
+        self.digests[year] = {
+            'year': edge_digest(previous['year'], edges),
+            'cumulative': edge_digest(previous['cumulative'], self.cumulative_edges[offset:])
+        }
+
+    def digest(self, kind, year):
+        '''
+        Digest of the 'year' or 'cumulative' graph of the year, it only changes when that graph or one before it changes
+        '''
+        return self.digests[year][kind]
+
+    def graph_year(self, year):
+        graph = nx.Graph()
+        graph.add_nodes_from(DATA.names)
+        graph.add_edges_from(self.year_edges[year])
+        return graph
+
+    def graph_previous_years(self, year):
+        graph = nx.Graph()
+        graph.add_nodes_from(DATA.names)
+        graph.add_edges_from(self.cumulative_edges[:self.offsets[year]])
+        return graph
+
+SWEEP = None
+
+def get_sweep():
+    global SWEEP
+    if SWEEP is None:
+        SWEEP = YearSweep()
+    return SWEEP
+
+def pivot_count(n, k=None, epsilon=None):
+    '''
+    Number of pivots to sample: k if given, otherwise log(n)/epsilon^2 which bounds the error of the
+    sampled distances by epsilon times the diameter with high probability
+    '''
+    if k is not None and k < 1:
+        raise ValueError(f"the number of pivots k must be at least 1, got {k}")
+    if k is None and epsilon <= 0:
+        raise ValueError(f"the error epsilon must be positive, got {epsilon}")
+    if k is None:
+        k = math.ceil(math.log(max(n, 2)) / epsilon ** 2)
+    return min(k, n)
+
+def approximate_closeness(network, pivots):
+    '''
+    Closeness centrality estimated from the distances to the pivots only.
+    Nodes that no pivot reaches are computed exactly, they are in small components without a pivot
+    '''
+    n = network.number_of_nodes()
+    total = dict.fromkeys(network, 0)
+    reached = dict.fromkeys(network, 0)
+    for p in pivots:
+        for node, d in nx.single_source_shortest_path_length(network, p).items():
+            if node != p:
+                total[node] += d
+                reached[node] += 1
+
+    closeness = {}
+    for c in nx.connected_components(network):
+        size = len(c)
+        for node in c:
+            if size == 1 or n == 1:
+                closeness[node] = 0.0
+            elif reached[node] == 0:
+                closeness[node] = nx.closeness_centrality(network, u=node)
+            else:
+                average = total[node] / reached[node]
+                closeness[node] = (1 / average) * (size - 1) / (n - 1)
+    return closeness
+
+def path_statistics(network):
+    '''
+    One BFS from every node gives together, for each connected component, the average shortest path length
+    and the diameter, and for each node the closeness centrality and the eccentricity.
+    The values are the same as nx.average_shortest_path_length on each component and nx.closeness_centrality
+    '''
+    n = len(network)
+    components = []
+    closeness = {}
+    eccentricity = {}
+    for c in nx.connected_components(network):
+        size = len(c)
+        total = 0
+        diameter = 0
+        for u in c:
+            lengths = nx.single_source_shortest_path_length(network, u)
+            totsp = sum(lengths.values())
+            total += totsp
+            eccentricity[u] = max(lengths.values())
+            diameter = max(diameter, eccentricity[u])
+            closeness[u] = 0.0
+            if totsp > 0 and n > 1:
+                closeness[u] = ((size - 1.0) / totsp) * ((size - 1.0) / (n - 1))
+        average = total / (size * (size - 1)) if size > 1 else 0
+        components.append({'nodes': c, 'average': average, 'diameter': diameter})
+    return {'components': components, 'closeness': closeness, 'eccentricity': eccentricity}
+
+def centrality(network, approximate=None, seed=None, paths=None):
+    '''
+    Betweenness and closeness centrality of the network with the parameters used to get them.
+    approximate is None for the exact values or a dict with either 'k' pivots or an 'epsilon' error,
+    and optionally its own 'seed', for the sampled estimates. Without a seed one is drawn and reported in the parameters
+    so that the estimates can be reproduced. The exact closeness is taken from paths (see path_statistics) when given
+    '''
+    n = network.number_of_nodes()
+    params = {'method': 'exact', 'k': n, 'epsilon': None, 'seed': None}
+    if approximate is not None:
+        if approximate.get('k') is None and approximate.get('epsilon') is None:
+            raise ValueError(f"approximate needs 'k' pivots or an 'epsilon' error, got {approximate}")
+        params['k'] = pivot_count(n, approximate.get('k'), approximate.get('epsilon'))
+        params['epsilon'] = approximate.get('epsilon')
+        params['seed'] = approximate.get('seed', seed)
+        if params['seed'] is None:
+            params['seed'] = random.randrange(2 ** 32)
+
+    if params['k'] >= n:
+        params['method'] = 'exact'
+        betweenness = nx.betweenness_centrality(network, normalized=True)
+        closeness = nx.closeness_centrality(network) if paths is None else paths['closeness']
+    else:
+        params['method'] = 'approximate'
+        #networkx samples the betweenness pivots with random.Random(seed).sample(list(network), k) for an int seed,
+        #the closeness is estimated from the same nodes
+        pivots = random.Random(params['seed']).sample(list(network.nodes()), params['k'])
+        betweenness = nx.betweenness_centrality(network, k=params['k'], normalized=True, seed=params['seed'])
+        closeness = approximate_closeness(network, pivots)
+    return betweenness, closeness, params
+
+#Iterations of a layout that starts from the positions of the previous year
+WARM_ITERATIONS = 20
+
+def spring_positions(network, initial=None, seed=None):
+    '''
+    Spring layout of the network as [x, y] lists.
+    With initial the nodes found in it start from those positions and fewer iterations are run, the others are placed at random
+    '''
+    start = {node: initial[node] for node in network if node in initial} if initial else None
+    if start:
+        pos = nx.spring_layout(network, pos=start, scale=2, seed=seed, iterations=WARM_ITERATIONS)
+    else:
+        pos = nx.spring_layout(network, scale=2, seed=seed)
+    return {node: [float(pos[node][0]), float(pos[node][1])] for node in network}
+
+class StableLayout:
+    '''
+    Positions of the yearly and of the cumulative graphs of a sweep, the layout of a year starts from the one
+    of the year before so that the nodes barely move from a year to the next
+    '''
+    def __init__(self, sweep=None, seed=None, start=2000):
+        self.sweep = get_sweep() if sweep is None else sweep
+        self.seed = seed
+        self.start = start
+        self.positions = {}
+
+    def get(self, kind, year, network=None):
+        '''
+        Positions of the 'year' or 'cumulative' graph of the year, network is that graph when it is already built
+        '''
+        key = (kind, year)
+        if key not in self.positions:
+            previous = self.get(kind, year - 1) if year > self.start else None
+            if network is None:
+                network = self.sweep.graph_year(year) if kind == 'year' else self.sweep.graph_previous_years(year)
+            self.positions[key] = spring_positions(network, previous, self.seed)
+        return self.positions[key]
+
+LAYOUTS = {}
+
+def get_layout(seed=None, sweep=None):
+    sweep = get_sweep() if sweep is None else sweep
+    if (seed, sweep) not in LAYOUTS:
+        LAYOUTS[(seed, sweep)] = StableLayout(sweep, seed)
+    return LAYOUTS[(seed, sweep)]
 
 class Year:
 
     '''
-    Builds a Collaboration Network for the individual years
+    Builds a Collaboration Network for the individual years.
+    With lazy the metrics and the layout are computed the first time they are needed and then kept.
+    seed fixes the spring layout, approximate samples the betweenness and closeness (see centrality)
     '''   
 
-    def __init__(self, year):
+    def __init__(self, year, sweep=None, lazy=False, seed=None, approximate=None):
 
-        global NAMES 
-        global FACULTY       
         self.year = year
+        self.seed = seed
+        self.approximate = approximate
+        self.centrality_params = {}
+        self.sweep = get_sweep() if sweep is None else sweep
 
         self.graph_year = nx.Graph()
         self.graph_previous_years = nx.Graph() 
 
-        self.year_info = {}
-        self.previous_year_info = {}
+        self._year_info = {}
+        self._previous_year_info = {}
+
+        self.informed = False
+        self.annotated = False
+        self.paths = {}
 
         self.build_graph()
+        if not lazy:
+            self.load()
+
+    @property
+    def year_info(self):
         self.set_information()
-        self.add_properties_network()
+        return self._year_info
 
-    def build_graph(self):
+    @property
+    def previous_year_info(self):
+        self.set_information()
+        return self._previous_year_info
 
-        self.graph_year.add_nodes_from(NAMES)
-        self.graph_previous_years.add_nodes_from(NAMES)
+    def get_paths(self, network):
+        '''
+        path_statistics of one of the two graphs, shared by set_information and add_properties_network
+        '''
+        key = 'year' if network is self.graph_year else 'previous_years'
+        if key not in self.paths:
+            self.paths[key] = path_statistics(network)
+        return self.paths[key]
 
-        for faculty in FACULTY:
-            for paper in FACULTY[faculty].papers:               
-                if (paper.year <= self.year) and (paper.year > 1999):
-                    for author in paper.authors:
-                        if (author in NAMES) and (author != FACULTY[faculty].name) and not(self.graph_previous_years.has_edge(FACULTY[faculty].name, author)) and not(self.graph_previous_years.has_edge(author, FACULTY[faculty].name)):
-                            self.graph_previous_years.add_edge(FACULTY[faculty].name, author)                           
+    def load(self):
+        '''
+        Computes the metrics and the node properties if they were not computed yet
+        '''
+        self.set_information()
+        self.add_properties_network()
+        return self
 
-                            if paper.year == self.year:
-                                self.graph_year.add_edge(FACULTY[faculty].name, author)
+    def export(self):
+        '''
+        Everything load computes, in a form that can be sent back from a worker process
+        '''
+        self.load()
+        return {
+            'year_info': self._year_info,
+            'previous_year_info': self._previous_year_info,
+            'centrality_params': self.centrality_params,
+            'year_nodes': dict(self.graph_year.nodes(data=True)),
+            'previous_year_nodes': dict(self.graph_previous_years.nodes(data=True))
+        }
+
+    def restore(self, metrics):
+        '''
+        Takes the output of export instead of computing it
+        '''
+        self._year_info = metrics['year_info']
+        self._previous_year_info = metrics['previous_year_info']
+        self.centrality_params = metrics['centrality_params']
+        for network, nodes in ((self.graph_year, metrics['year_nodes']), (self.graph_previous_years, metrics['previous_year_nodes'])):
+            for node, data in nodes.items():
+                network.nodes[node].update(data)
+        self.informed = True
+        self.annotated = True
+        return self
+
+    def build_graph(self):
+
+        self.graph_year = self.sweep.graph_year(self.year)
+        self.graph_previous_years = self.sweep.graph_previous_years(self.year)
 
         return
 
     def set_information(self):
 
+        if self.informed:
+            return
+
         def get_info(network, network_dic):
             def get_average_degree(network):
                 degrees = [i[1] for i in (network.degree())]
@@ -74,10 +435,10 @@ class Year:
                 return network.number_of_edges()
 
             def get_connected_components(network):
-                connected_components = nx.connected_components(network)
                 num = 0    
                 connected_components_list = []
-                for i in connected_components :
+                for c in self.get_paths(network)['components']:
+                    i = c['nodes']
                     if len(i) > 1 : 
                         num += 1
                         temp = network.subgraph(list(i)).copy()       
@@ -85,9 +446,7 @@ class Year:
                 return num, connected_components_list
 
             def get_dist(network):
-                average=[]
-                for C in (network.subgraph(c).copy() for c in nx.connected_components(network)):
-                    average.append(nx.average_shortest_path_length(C))
+                average = [c['average'] for c in self.get_paths(network)['components']]
                 dist_connected=[]
                 for i in range(len(average)):
                     if average[i] != 0:
@@ -117,13 +476,15 @@ class Year:
             network_dic['number_of_edges'] = get_number_edges(network)
             network_dic['number_of_connected_components'], network_dic['connected_components'] = get_connected_components(network)
             network_dic['avg_dist'] = get_dist(network)
+            network_dic['diameters'] = [c['diameter'] for c in self.get_paths(network)['components'] if len(c['nodes']) > 1]
             network_dic['most_edge_faculty'] = get_most_edge_faculty(network)
             network_dic['density'] = get_density(network)
             network_dic['global_clustering'] = get_global_clustering(network)
             network_dic['degree_correlation_coefficient'] = get_degree_correlation_coefficient(network)
 
-        get_info(self.graph_year,self.year_info)
-        get_info(self.graph_previous_years,self.previous_year_info)
+        get_info(self.graph_year,self._year_info)
+        get_info(self.graph_previous_years,self._previous_year_info)
+        self.informed = True
 
         return
 
@@ -131,18 +492,25 @@ class Year:
         '''
         Displays the network_x graph
         '''
+        #matplotlib is only imported here, it is slow to import and nothing else draws with it
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(24, 12))
         nx.draw_random(self.graph_year, with_labels=True, font_weight='bold')
         plt.show()
         return
 
     def add_properties_network(self):
+
+        if self.annotated:
+            return
+
         def get_graph_properties(network):
             degrees = dict(nx.degree(network))
-            betweenness_centrality = nx.betweenness_centrality(network, normalized=True)
+            paths = self.get_paths(network)
+            betweenness_centrality, closeness_centrality, params = centrality(network, self.approximate, self.seed, paths)
             eigenvector_centrality = nx.eigenvector_centrality(network, max_iter=600)
             degree_centrality = nx.degree_centrality(network)
-            closeness_centrality = nx.closeness_centrality(network)
             clustering = nx.clustering(network)
 
             nx.set_node_attributes(network, name='degree', values=degrees)
@@ -151,29 +519,98 @@ class Year:
             nx.set_node_attributes(network, name='eigenvector_centrality', values=eigenvector_centrality)
             nx.set_node_attributes(network, name='closeness_centrality', values=closeness_centrality)
             nx.set_node_attributes(network, name='clustering', values=clustering)
+            nx.set_node_attributes(network, name='eccentricity', values=paths['eccentricity'])
+            network.graph['centrality'] = params
 
             number_to_adjust_by = 5
 
             adjusted_node_size = dict([(node, degree+number_to_adjust_by) for node, degree in nx.degree(network)])
             nx.set_node_attributes(network, name='adjusted_node_size', values=adjusted_node_size)
 
-            pos = nx.spring_layout(network, scale = 2)
-            for node in network.nodes:
-                network.nodes[node]['pos'] = list(pos[node])
+            kind = 'year' if network is self.graph_year else 'cumulative'
+            pos = get_layout(self.seed, self.sweep).get(kind, self.year, network)
+            nx.set_node_attributes(network, name='pos', values=pos)
             
             return
 
         get_graph_properties(self.graph_year)
         get_graph_properties(self.graph_previous_years)
+        self.centrality_params = {
+            'year': self.graph_year.graph['centrality'],
+            'previous_years': self.graph_previous_years.graph['centrality']
+        }
+        self.annotated = True
         
         return
 
 
+def year_metrics(year, seed=None, approximate=None):
+    '''
+    Runs in the worker processes of compute_years
+    '''
+    return Year(year, lazy=True, seed=seed, approximate=approximate).export()
+
+def compute_years(years, workers=None, seed=None, approximate=None):
+    '''
+    Builds the Year of every year with the metrics computed over a process pool.
+    For a given seed the output is the same as building each Year in this process
+    '''
+    years = list(years)
+    out = {}
+    func = partial(year_metrics, seed=seed, approximate=approximate)
+    for year, metrics in zip(years, parallel_map(func, years, workers, chunksize=1)):
+        out[year] = Year(year, lazy=True, seed=seed, approximate=approximate).restore(metrics)
+    return out
+
+
+class LazyYears:
+    '''
+    The Year of a year is only built the first time it is requested, a server reading every page
+    from the artifact store never builds one and never loads the corpus
+    '''
+    def __init__(self, years, seed=None, approximate=None):
+        self.years = list(years)
+        self.seed = seed
+        self.approximate = approximate
+        self.built = {}
+        self.lock = threading.Lock()
+
+    def __getitem__(self, year):
+        if year not in self.years:
+            raise KeyError(year)
+        with self.lock:
+            if year not in self.built:
+                self.built[year] = Year(year, lazy=True, seed=self.seed, approximate=self.approximate)
+            return self.built[year]
+
+    def __contains__(self, year):
+        return year in self.years
+
+    def __iter__(self):
+        return iter(self.years)
+
+
+def faculty_year_authors(name, year):
+    '''
+    All the co-authors of name in the year and the ones in SCSE, one entry per authorship
+    '''
+    def build():
+        rows = DATA.corpus.owner_rows([name])
+        _, owner, author = DATA.corpus.authorships(rows[DATA.corpus.year[rows] == year])
+        author = author[author != owner]
+        return DATA.scse.names(author), DATA.scse.names(author[DATA.scse[author]])
+    return FACULTY_YEARS.get((name, year), build)
+
 class Faculty:
-    def __init__(self, name, faculty_list):
+    '''
+    Graphs of the collaborations of one faculty in each of the years, by default 2000 to 2021
+    '''
+    def __init__(self, name, faculty_list, years=None):
 
         self.name = name
         self.faculty_list = faculty_list
+        self.faculty_set = set(faculty_list)
+        self.years = list(range(2000, 2022)) if years is None else list(years)
 
         self.graph_years_scse = {}
         self.graph_years_all = {}        
@@ -189,7 +626,7 @@ class Faculty:
                 for i in g.nodes():
                     if i == self.name:
                         g.nodes[i]['color'] = "#0033cc"
-                    elif i in self.faculty_list:
+                    elif i in self.faculty_set:
                         g.nodes[i]['color'] = "#99d6ff"
                     else:
                         g.nodes[i]['color'] = "#666666"
@@ -198,15 +635,11 @@ class Faculty:
             graph = nx.Graph()
             graph_all = nx.Graph()      
 
-            graph.add_nodes_from(pd.read_csv("Faculty.csv")['Faculty'].to_list())      
+            graph.add_nodes_from(FACULTY_LIST)      
 
-            for paper in FACULTY[self.name].papers:
-                if paper.year == year:
-                    for author in paper.authors:
-                        if (author != FACULTY[self.name].name) and not(graph.has_edge(FACULTY[self.name].name, author)) and not(graph.has_edge(author, FACULTY[self.name].name)):
-                            graph_all.add_edge(FACULTY[self.name].name, author)
-                            if (author in NAMES):
-                                graph.add_edge( FACULTY[self.name].name, author)
+            authors, scse_authors = faculty_year_authors(self.name, year)
+            graph_all.add_edges_from((self.name, i) for i in authors)
+            graph.add_edges_from((self.name, i) for i in scse_authors)
 
             
             set_color_nodes(graph)
@@ -217,7 +650,7 @@ class Faculty:
 
             return
         
-        for i in range(2000,2022):
+        for i in self.years:
             build_graph(i)
         return
     
@@ -233,13 +666,17 @@ class Faculty:
 
             return info
         
-        for i in range(2000,2022):
+        for i in self.years:
             self.info[i] = getYear(i)
         
         return
 
 
 class FacultySubset:
+    '''
+    Graphs of the collaborations of a set of faculty, names is a list or a dict of colours.
+    With year only the graphs of that year are built, for the subset and for each of its faculty
+    '''
     def __init__(self, names, year = None):
         self.colour_coord = None
         self.year = year
@@ -248,6 +685,7 @@ class FacultySubset:
         else:
             self.names  = names.keys()
             self.colour_coord = names
+        self.name_set = set(self.names)
 
         self.graph_years = {}
         self.graph_year_all = nx.Graph()
@@ -261,7 +699,7 @@ class FacultySubset:
             self.colour_based_position()
     
     def colour_based_position(self):
-        for year in range(2000,2022):
+        for year in self.graph_years:
             g = self.graph_years[year]
             for i in g.nodes():
                 if(i in self.colour_coord):
@@ -282,28 +720,20 @@ class FacultySubset:
             graph = nx.Graph()
             graph_all = nx.Graph() 
             
-            NAMES = pd.read_csv("Faculty.csv")['Faculty'].to_list()
-            
-            graph.add_nodes_from(NAMES)
+            graph.add_nodes_from(FACULTY_LIST)
             if year == 2021:
-                graph_all.add_nodes_from(NAMES)
+                graph_all.add_nodes_from(FACULTY_LIST)
             for i in graph.nodes():
-                if i in self.names:
+                if i in self.name_set:
                     graph.nodes[i]['color'] = "#0033cc"
                 else:
                     graph.nodes[i]['color'] = "#666666"
 
-            for faculty in self.names:
-                for paper in FACULTY[faculty].papers:                
-                        for author in paper.authors:
-                            if (author != faculty) and not(graph.has_edge(faculty, author)) and not(graph.has_edge(author,faculty)):                                
-                                if (author in NAMES):
-                                    if paper.year == year:
-                                        graph.add_edge(faculty, author)
-                                    if year == 2021:
-                                        graph_all.add_edge(faculty,author)
-                                        
-                                    
+            in_year = DATA.corpus.year[row] == year
+            graph.add_edges_from(zip(DATA.scse.names(owner[in_year]), DATA.scse.names(author[in_year])))
+            if year == 2021:
+                graph_all.add_edges_from(zip(DATA.scse.names(owner), DATA.scse.names(author)))
+
 
             degrees = dict(nx.degree(graph)) 
             nx.set_node_attributes(graph, name='degree', values=degrees)
@@ -314,6 +744,10 @@ class FacultySubset:
                 self.graph_year_all = graph_all
 
             return
+        row, owner, author = DATA.corpus.authorships(DATA.corpus.owner_rows(self.names))
+        keep = DATA.scse[author] & (author != owner)
+        row, owner, author = row[keep], owner[keep], author[keep]
+
         if self.year == None:
             for i in tqdm(range(2000,2022)):
                 build_graph(i)
@@ -322,12 +756,67 @@ class FacultySubset:
         return
     
     def build_faculty(self):
+        years = None if self.year is None else [self.year]
         for i in self.names:
-            self.faculty[i] = Faculty(i, self.names)
+            self.faculty[i] = Faculty(i, self.names, years)
+
+class LRUCache:
+    '''
+    Bounded cache that drops the least recently used entry once maxsize entries are stored
+    '''
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        '''
+        Returns the entry of key, calling build() to create it if it is not stored
+        '''
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+
+        value = build()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return {'size': len(self.entries), 'maxsize': self.maxsize, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+SUBSET_CACHE = LRUCache(64)
+#Co-authors of a faculty in a year (see faculty_year_authors), shared by the Faculty of every selection
+FACULTY_YEARS = LRUCache(4096)
+
+def get_faculty_subset(names, year=None):
+    '''
+    FacultySubset shared between requests, keyed by the set of names, the colour of each name and the year
+    '''
+    if type(names) == dict:
+        key = (frozenset(names.items()), year)
+    else:
+        key = (frozenset(names), year)
+    return SUBSET_CACHE.get(key, lambda: FacultySubset(names, year=year))
 
 class ManageGraph:    
     def __init__(self):
-        self.faculty, self.names = FACULTY, NAMES
+        self.faculty, self.names = DATA.faculty, DATA.names
         
         self.nodes=[]
         self.edges=[]
@@ -335,15 +824,13 @@ class ManageGraph:
         for x in self.faculty:
             if(self.faculty[x].managment=='Y'):
                 self.nodes.append(x)      
-                p=self.faculty[x].papers
-                for y in p:
-                    for a in y.authors:
-                        if(a in self.names):
-                            self.edges.append((x, a))
+                _, _, author = DATA.corpus.authorships(DATA.corpus.owner_rows([x]))
+                for a in DATA.scse.names(author[DATA.scse[author]]):
+                    self.edges.append((x, a))
     
 class PositionGraph:    
     def __init__(self, target):
-        faculty, names = FACULTY, NAMES        
+        faculty, names = DATA.faculty, DATA.names        
         self.nodes=[]
         self.edges=[]
         
@@ -351,18 +838,16 @@ class PositionGraph:
             if(faculty[x].position==target):
                 self.nodes.append(x)
                 
+        members = AuthorIndex(DATA.corpus, self.nodes)
         for x in self.nodes:
-            p=faculty[x].papers
-            
-            for y in p:
-                for a in y.authors:
-                    if(a in self.nodes):
-                        self.edges.append((x,a))
+            _, _, author = DATA.corpus.authorships(DATA.corpus.owner_rows([x]))
+            for a in members.names(author[members[author]]):
+                self.edges.append((x,a))
                         
                         
 class ExcellenceGraph:    
     def __init__(self):
-        self.faculty, self.names = FACULTY, NAMES
+        self.faculty, self.names = DATA.faculty, DATA.names
         
         self.nodes=[]
         self.edges=[]
@@ -374,7 +859,7 @@ class ExcellenceGraph:
                 
 class AreaGraph:    
     def __init__(self, area):
-        self.faculty, self.names = FACULTY, NAMES
+        self.faculty, self.names = DATA.faculty, DATA.names
         
         self.nodes=[]
         self.edges=[]
@@ -385,34 +870,81 @@ class AreaGraph:
 
 
 
+#Number of people kept in the top graphs of Hire and the years of its collaboration network
+HIRE_TOP = 150
+HIRE_YEARS = (2016, 2020)
+
 class Hire:
-    def __init__(self):
+    '''
+    Collaboration network of the people in AdditionalData from start to end, ranked by degree and by excellence.
+    The degrees and excellence counts are taken over the coauthorship columns of the corpus and only the top k of each
+    are turned into graphs, the whole network is only built with approximate (see centrality) for the sampled
+    betweenness and closeness of every node. seed fixes the layout of the top graphs, excellence is the Excellence rule
+    the people are ranked by
+    '''
+    def __init__(self, approximate=None, seed=None, k=HIRE_TOP, start=HIRE_YEARS[0], end=HIRE_YEARS[1],
+                 excellence=PERSON_EXCELLENCE):
         
-        self.Hire = getHire()
+        self.corpus = getHireCorpus()
+        self.rule = excellence
+        self.approximate = approximate
+        self.centrality_params = None
+        self.k = k
 
-        self.l = []
-        self.graph = nx.Graph() 
+        self.graph = None
         self.degree = None 
+        self.degree_distribution = None
 
         self.excellence_order = None
 
-        self.generate_graph_years()
-        self.set_node_info(self.graph)
+        self.generate_graph_years(start, end)
+        if approximate is not None:
+            self.add_centrality(approximate)
         self.get_top()
         self.copyNodeInfo()
+        self.add_layout(seed)
        
    
-    def generate_graph_years(self):  
+    def generate_graph_years(self, start, end):  
         print("Generating graphs")
-        for faculty in tqdm(self.Hire):
-            for paper in self.Hire[faculty].papers:               
-                if (paper.year < 2021) and (paper.year > 2015):
-                    for author in paper.authors:
-                        if (author != self.Hire[faculty].name) and not(self.graph.has_edge(self.Hire[faculty].name, author)) and not(self.graph.has_edge(author, self.Hire[faculty].name)):
-                            self.graph.add_edge(self.Hire[faculty].name, author)                                                           
-                            self.graph.nodes[self.Hire[faculty].name]['excellent'] = self.Hire[faculty].excellenceNode                            
+        corpus = self.corpus
+        _, owner, author = corpus.authorships(corpus.rows(start=start, end=end))
+        keep = author != owner
+        owner, author = owner[keep], author[keep]
+
+        #Every edge once, in the order it first appears
+        first = first_pairs(owner, author)
+        self.source, self.target = owner[first], author[first]
+        size = len(corpus.author_names)
+        self.degrees = numpy.bincount(self.source, minlength=size) + numpy.bincount(self.target, minlength=size)
+
+        #People in the order they join the network, the ranking keeps this order between equal values
+        joined = numpy.empty(2 * len(first), dtype=numpy.int64)
+        joined[0::2], joined[1::2] = self.source, self.target
+        _, index = numpy.unique(joined, return_index=True)
+        self.people = joined[numpy.sort(index)]
+
+        #Score of the excellence rule, only the people that brought in a new edge have one
+        scores = self.rule.scores(corpus)
+        self.excellence = numpy.zeros(size, dtype=scores.dtype)
+        owners = numpy.unique(self.source)
+        self.excellence[owners] = scores[owners]
+
+        degree, count = numpy.unique(self.degrees[self.people], return_counts=True)
+        self.degree_distribution = dict(zip(degree.tolist(), (count / len(self.people)).tolist()))
         return  
 
+    def add_centrality(self, approximate):
+        names = self.corpus.author_names
+        self.graph = nx.Graph()
+        self.graph.add_nodes_from(names[i] for i in self.people)
+        self.graph.add_edges_from(zip(self.corpus.names(self.source), self.corpus.names(self.target)))
+        betweenness, closeness, self.centrality_params = centrality(self.graph, approximate)
+        nx.set_node_attributes(self.graph, name='betweenness', values=betweenness)
+        nx.set_node_attributes(self.graph, name='closeness_centrality', values=closeness)
+        self.graph.graph['centrality'] = self.centrality_params
+        return
+
     def set_node_info(self, network):
         degrees = dict(nx.degree(network)) 
         nx.set_node_attributes(network, name='degree', values=degrees)
@@ -420,39 +952,29 @@ class Hire:
         return
     
     def get_top(self):
-        def sort_graph(sortValue):
-            l = []
-            temp = sorted(sortValue.items() , key=lambda x: x[1] , reverse=True)
-            sortValue = temp
-            for i in temp[:150]:
-                l.append(i[0])
-            return l
+        '''
+        The k people with the highest degree and with the most excellent papers, kept on a heap of size k,
+        and the graphs of the edges among each of them
+        '''
+        names = self.corpus.author_names
+        people = self.people.tolist()
 
+        def top(values):
+            values = values.tolist()
+            return heapq.nlargest(self.k, people, key=values.__getitem__)
 
-        def build_graph(l):
+        def build_graph(ids):
+            members = numpy.zeros(len(names), dtype=bool)
+            members[ids] = True
+            inside = members[self.source] & members[self.target]
             g = nx.Graph()
-            for i in self.graph.edges():
-                if ((i[0] in  l) and (i[1] in l)):                
-                    g.add_edge(i[0],i[1])      
+            g.add_edges_from(zip(self.corpus.names(self.source[inside]), self.corpus.names(self.target[inside])))
             return g
 
-        def get_excellence_dictionary():
-            temp = {}
-            for i in self.graph.nodes():
-                try:
-                    temp[i] = self.graph.nodes[i]['excellent']
-                except:
-                    temp[i] = 0
-            return temp
-
-        self.excellence_order = get_excellence_dictionary()
-        self.degree_orderd = dict(nx.degree(self.graph))
-
-        self.excellence_order = {k: v for k, v in sorted(self.excellence_order.items(), key=lambda item: item[1], reverse=True)}
-        self.degree_orderd = {k: v for k, v in sorted(self.degree_orderd .items(), key=lambda item: item[1], reverse=True)}
-
-        degrees = sort_graph(self.degree_orderd) 
-        orderBy = sort_graph(self.excellence_order)
+        degrees = top(self.degrees)
+        orderBy = top(self.excellence)
+        self.degree_orderd = {names[i]: int(self.degrees[i]) for i in degrees}
+        self.excellence_order = {names[i]: self.excellence[i].item() for i in orderBy}
 
         self.graph_degree = build_graph(degrees)
         self.graph_excellence = build_graph(orderBy)
@@ -462,8 +984,12 @@ class Hire:
     def copyNodeInfo(self):   
         def setInfo(network):
             for i in network.nodes():
-                network.nodes[i]['original_degree'] = self.graph.nodes[i]['degree']
-                network.nodes[i]['excellent'] = self.graph.nodes[i]['excellent']
+                person = self.corpus.author_ids[i]
+                network.nodes[i]['original_degree'] = int(self.degrees[person])
+                network.nodes[i]['excellent'] = self.excellence[person].item()
+                if self.graph is not None:
+                    for key in ('betweenness', 'closeness_centrality'):
+                        network.nodes[i][key] = self.graph.nodes[i][key]
                 if network.nodes[i]['excellent'] > 25:
                     network.nodes[i]['color'] = "#0033cc"
                 else:
@@ -475,6 +1001,15 @@ class Hire:
         self.set_node_info(self.graph_degree)  
         self.set_node_info(self.graph_excellence)
 
+    def add_layout(self, seed=None):
+        '''
+        Positions of the two top graphs, the people in both keep the place they have in the degree graph
+        '''
+        degree = spring_positions(self.graph_degree, seed=seed)
+        nx.set_node_attributes(self.graph_degree, name='pos', values=degree)
+        nx.set_node_attributes(self.graph_excellence, name='pos', values=spring_positions(self.graph_excellence, degree, seed))
+
+
         
         
 
@@ -1,56 +1,343 @@
+import argparse
+import email.utils
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pandas as pd
-from tqdm import tqdm
 import requests
-import threading
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
 
-def save_file(url,name):
-    try:
-        response = requests.get(url)
-        with open(f'./AdditionalData/{name}.xml', 'wb') as file:
-            file.write(response.content)
-    except Exception as e:
-        print(e)
-
-def fetch(urls, names):
-    base_url = "https://dblp.org/pid/"   
-    n = 0
-    for i in range(len(urls)):
-        save_file(base_url+urls[i]+".xml",names[i])   
-        if int(i/len(urls)) != n:        
-            n = int(i/len(urls))   
-            print(n*10)  
-          
+from packed import Folder, Pack, pack_path, write_atomic
 
-if __name__ =="__main__":
-    
-    df = pd.read_csv("Additional.csv")
-    print("Number of People : ",len(df))    
+BASE_URL = "https://dblp.org/pid/"
 
-    l2 = df.Pid.to_list()
-    l1 = df.Name.to_list()
+#Requests in flight at a time, they share the connections of one session
+WORKERS = 8
+TIMEOUT = 30
+RETRIES = 5
+#Seconds before the first retry, doubled on every attempt
+BACKOFF = 1.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
-    n, p = [], []
+#Files already downloaded, an interrupted fetch starts again from there
+MANIFEST_PATH = "./cache/fetch_manifest.json"
+FACULTY_MANIFEST_PATH = "./cache/fetch_manifest_faculty.json"
 
-    k = 200
-    for i in range(len(l1)//k):
-        n.append(l1[(i)*k:(i+1)*k])
-        p.append(l2[(i)*k:(i+1)*k])
-    
-    n.append(l1[(i+1)*k:])
-    p.append(l2[(i+1)*k:])
 
-    t = [threading.Thread(target=fetch, args=(p[i],n[i],)) for i in range(len(n))]
+class Manifest:
+    '''
+    pid, size and headers of every file downloaded so far, saved every 100 files and at the end
+    '''
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.changed = 0
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as file:
+                self.entries = json.load(file)
 
-    for i in t:
-        i.start()
-    
-    for i in t:
-        i.join()
+    def done(self, name, pid, size):
+        '''
+        True if the file of name was downloaded for this pid and the stored copy, of size bytes, is still complete
+        '''
+        entry = self.entries.get(name)
+        return entry is not None and entry['pid'] == pid and size == entry['size']
+
+    def add(self, name, entry):
+        with self.lock:
+            self.entries[name] = entry
+            self.changed += 1
+            if self.changed >= 100:
+                self.write()
+
+    def save(self):
+        with self.lock:
+            self.write()
+
+    def write(self):
+        #Called with the lock held
+        if not self.path or not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries).encode())
+        self.changed = 0
+
+
+class RateLimiter:
+    '''
+    Spaces the requests of all the threads by at least 1/rate seconds, no limit without a rate
+    '''
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self.next = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next)
+            self.next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+def make_session(workers=WORKERS):
+    '''
+    One session shared by the threads so that the connections are kept alive and reused
+    '''
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers['User-Agent'] = "network-science-project"
+    return session
+
+
+def retry_delay(attempt, backoff, response=None):
+    '''
+    Exponential backoff with jitter, or the Retry-After of the server when it sends one
+    '''
+    if response is not None and response.headers.get('Retry-After', '').isdigit():
+        return int(response.headers['Retry-After'])
+    return backoff * 2 ** attempt * (0.5 + random.random() / 2)
+
+
+def download(session, url, limiter=None, retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT, headers=None):
+    '''
+    GETs the url. Connection errors, timeouts and the statuses of RETRY_STATUS are retried,
+    other errors are raised at once. A 304 to the conditional headers is returned as it is
+    '''
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        response = None
+        try:
+            response = session.get(url, timeout=timeout, headers=headers)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response
+            error = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt == retries:
+            raise error
+        time.sleep(retry_delay(attempt, backoff, response))
+
+
+def signature(content):
+    '''
+    Number of papers (n on the root) and latest mdate of a dblp person file, they change whenever a record does
+    '''
+    n = re.search(rb'<dblpperson[^>]*\bn="(\d+)"', content[:1024])
+    mdates = re.findall(rb'mdate="([0-9-]+)"', content)
+    return [int(n.group(1)) if n else None, max(mdates).decode() if mdates else None]
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
 
-    print("Done Fetching")
 
+def fetch_all(people, folder="./AdditionalData", base_url=BASE_URL, workers=WORKERS, manifest=None,
+              rate=None, retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT, refresh=False, pack=False):
+    '''
+    Downloads the file of every (name, pid) into folder over a pool of workers threads, or into the pack of folder with pack.
+    The files of the manifest are skipped, with refresh they are requested again with the ETag and Last-Modified
+    of the manifest and only rewritten when the server answers with a file whose n or mdate differ.
+    Returns the counts, the names of the files that changed and the throughput of the run
+    '''
+    if pack and os.path.isdir(folder) and any(i.endswith(".xml") for i in os.listdir(folder)):
+        #preprocess reads a file on disk before its packed copy, the new content would never be read
+        raise ValueError(f"{folder} still has xml files, pack them first with: python packed.py pack {folder} --remove")
+    store = Pack(pack_path(folder)) if pack else Folder(folder)
+    manifest = Manifest(None) if manifest is None else manifest
+    session = make_session(workers)
+    limiter = RateLimiter(rate)
 
+    if refresh:
+        todo = list(people)
+    else:
+        todo = [(name, pid) for name, pid in people if not manifest.done(name, pid, store.size(name))]
+    stats = {'files': 0, 'skipped': len(people) - len(todo), 'unchanged': 0, 'failed': 0, 'bytes': 0, 'changed': []}
 
- 
-    
+    def save(name, pid):
+        '''
+        True if the file was written
+        '''
+        entry = manifest.entries.get(name) if manifest.done(name, pid, store.size(name)) else None
+        headers = conditional_headers(entry) if entry is not None else None
+        response = download(session, base_url + pid + ".xml", limiter, retries, backoff, timeout, headers)
+        if response.status_code == 304:
+            return False, 0
+        content = response.content
+        new = {'pid': pid, 'size': len(content), 'etag': response.headers.get('ETag'),
+               'last_modified': response.headers.get('Last-Modified'), 'signature': signature(content), 'fetched': time.time()}
+        changed = entry is None or entry.get('signature') != new['signature']
+        if changed:
+            store.write(name, content)
+        else:
+            new['size'] = entry['size']
+        manifest.add(name, new)
+        return changed, len(content)
 
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {pool.submit(save, name, pid): name for name, pid in todo}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                changed, size = future.result()
+                stats['bytes'] += size
+                stats['files'] += 1
+                if changed:
+                    stats['changed'].append(futures[future])
+                else:
+                    stats['unchanged'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"{futures[future]}: {e}")
+    store.save()
+    manifest.save()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['files_per_sec'] = stats['files'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def read_people(path="Additional.csv"):
+    df = pd.read_csv(path)
+    return list(zip(df.Name.to_list(), df.Pid.to_list()))
+
+
+def read_faculty(path="Faculty.csv"):
+    '''
+    Name and pid of the SCSE faculty, the pid is taken from the link to their xml
+    '''
+    df = pd.read_csv(path)
+    return [(name, re.search(r'/pid/(.+)\.xml', link).group(1)) for name, link in zip(df['Faculty'], df['Links_XML'])]
+
+
+def fixture_pid(path):
+    '''
+    pid on the root element of a dblp person file
+    '''
+    with open(path, 'rb') as file:
+        head = file.read(1024)
+    return re.search(rb'<dblpperson[^>]*\bpid="([^"]+)"', head).group(1).decode()
+
+
+def fixture_server(folder, fail_rate=0.0, port=0, conditional=True):
+    '''
+    Local stand-in for dblp serving the person files of folder as /pid/<pid>.xml.
+    fail_rate of the requests get a 503 to exercise the retries. With conditional it sends an ETag and a Last-Modified
+    and answers 304 to a matching If-None-Match, the files are read on every request so they can be edited in between
+    '''
+    files = {}
+    for name in os.listdir(folder):
+        if name.endswith(".xml"):
+            files[fixture_pid(os.path.join(folder, name))] = os.path.join(folder, name)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            pid = self.path[len("/pid/"):-len(".xml")] if self.path.startswith("/pid/") else None
+            if random.random() < fail_rate:
+                self.reply(503, b"")
+            elif pid not in files:
+                self.reply(404, b"")
+            else:
+                with open(files[pid], 'rb') as file:
+                    body = file.read()
+                if not conditional:
+                    self.reply(200, body)
+                    return
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                modified = email.utils.formatdate(os.path.getmtime(files[pid]), usegmt=True)
+                if self.headers.get('If-None-Match') == etag:
+                    self.reply(304, b"", {'ETag': etag})
+                else:
+                    self.reply(200, body, {'ETag': etag, 'Last-Modified': modified})
+
+        def reply(self, status, body, headers={}):
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.people = [(os.path.basename(path)[:-4], pid) for pid, path in files.items()]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ =="__main__":
+    parser = argparse.ArgumentParser(description="Downloads the dblp files of the people of Additional.csv")
+    parser.add_argument("--out", default=None, help="by default ./AdditionalData, or ./Data with --faculty")
+    parser.add_argument("--faculty", action="store_true", help="fetch the SCSE faculty of Faculty.csv instead")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ask again for the files already fetched and only rewrite the ones that changed")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=float, default=None, help="at most this many requests per second")
+    parser.add_argument("--retries", type=int, default=RETRIES)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--pack", action="store_true",
+                        help="write the files into the compressed OUT.pack instead of one file each, OUT must hold no xml files, see packed.py")
+    parser.add_argument("--test-server", default=None, metavar="FOLDER",
+                        help="fetch the files of FOLDER from a local server instead of dblp, into --out")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of the test server requests answered with a 503")
+    parser.add_argument("--no-etag", action="store_true", help="the test server sends no ETag, changes are found from n and mdate")
+    args = parser.parse_args()
+
+    out = args.out or ("./Data" if args.faculty else "./AdditionalData")
+    manifest = args.manifest or (FACULTY_MANIFEST_PATH if args.faculty else MANIFEST_PATH)
+
+    if args.test_server:
+        server = fixture_server(args.test_server, args.fail_rate, conditional=not args.no_etag)
+        people = server.people
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/pid/"
+        backoff = 0.05
+    else:
+        people = read_faculty() if args.faculty else read_people()
+        base_url = BASE_URL
+        backoff = BACKOFF
+    print("Number of People : ", len(people))
+
+    try:
+        stats = fetch_all(people, out, base_url, args.workers, Manifest(manifest), args.rate, args.retries, backoff,
+                          args.timeout, args.refresh, args.pack)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"{stats['files']} files ({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']:.2f} s, "
+          f"{stats['files_per_sec']:.1f} files/sec, {stats['skipped']} already there, {stats['failed']} failed")
+
+    if args.refresh:
+        print(f"{len(stats['changed'])} changed, {stats['unchanged']} unchanged")
+        #Only the faculty files feed the year graphs, AdditionalData changes the fingerprint the Hire page is kept under
+        if stats['changed'] and args.faculty:
+            from preprocess import changed_years
+            print("Years to recompute:", changed_years(out, stats['changed']))
+
+    print("Done Fetching")
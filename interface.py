@@ -2,17 +2,23 @@ import dash
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from flask import jsonify
 import dash_cytoscape as cyto
 import plotly.express as px
 
-from collections import Counter
+from collections import Counter, OrderedDict
+import threading
+import time
+
 import networkx as nx
 import pandas as pd
 
-import matplotlib.pyplot as plt
 
-from faculty import ManageGraph, PositionGraph, ExcellenceGraph, Hire, FacultySubset, AreaGraph
+from preprocess import FACULTY_LIST, corpus_fingerprint
+from faculty import ManageGraph, PositionGraph, ExcellenceGraph, Hire, AreaGraph, LRUCache, get_faculty_subset
+from elements import ElementStore, graph_elements, has_positions
+from artifacts import ArtifactStore
 
 app = dash.Dash(external_stylesheets=[
                 dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
@@ -85,36 +91,164 @@ FACULTY_GRAPH_STYLESHEET = [{
     }
 }]
 
+YEARS = {}
 YEAR = {}
 OVERALL_GRAPHS = {}
-FACULTY_SUBSET = None
+
+#Pages rendered on the first request are built once even if several requests come at the same time
+RENDER_LOCK = threading.Lock()
+
+#Faculty Analysis results keyed by (names, year), shared by every user submitting the same selection
+FACULTY_RESULTS = LRUCache(128)
 
 MANAGEMENT_GRAPH = {}
 
 EXCELLENCE_GRAPH = {}
 
-MANAGE = ManageGraph()
-LECT = PositionGraph('Lecturer')
-SLECT = PositionGraph('Senior Lecturer')
-ASST = PositionGraph('Assistant Professor')
-ASSOC = PositionGraph('Associate Professor')
-PROF = PositionGraph('Professor')
-EXC = ExcellenceGraph()
-
 areas=['Computer Networks', 'Computer Graphics', 'Computer Architecture',
        'Distributed Systems', 'Data Management', 'AI/ML',
        'Computer Vision', 'Multimedia', 'Data Mining', 'HCI',
        'Information Retrieval', 'Bioinformatics', 'Cyber Security',
        'Software Engg']
 
-AREA = {}
+positions = ['Lecturer', 'Senior Lecturer', 'Assistant Professor', 'Associate Professor', 'Professor']
+
+GROUPS = None
+GROUPS_LOCK = threading.Lock()
 
-for x in areas:
-    AREA[x]=AreaGraph(x)
+
+def get_groups():
+    '''
+    Faculty of the management, position, excellence and area pages, built the first time one of them is shown
+    '''
+    global GROUPS
+    with GROUPS_LOCK:
+        if GROUPS is None:
+            groups = {'manage': ManageGraph(), 'excellence': ExcellenceGraph()}
+            for x in positions:
+                groups[x] = PositionGraph(x)
+            groups['areas'] = {x: AreaGraph(x) for x in areas}
+            GROUPS = groups
+    return GROUPS
 
 HIRE = None
 
 
+class Precompute:
+    '''
+    Runs the builds of the pages one after the other in a background thread, the server answers in the meantime.
+    Keeps the state, the progress and the time of every stage
+    '''
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, name, func, items=None):
+        '''
+        func is called once, or on every item when items are given
+        '''
+        self.stages[name] = {'func': func, 'items': items, 'status': 'pending',
+                             'done': 0, 'total': 1 if items is None else len(items), 'seconds': None, 'error': None}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="precompute", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        for name, stage in self.stages.items():
+            with self.lock:
+                stage['status'] = 'running'
+            start = time.perf_counter()
+            try:
+                if stage['items'] is None:
+                    stage['func']()
+                    stage['done'] = 1
+                else:
+                    for i in stage['items']:
+                        stage['func'](i)
+                        stage['done'] += 1
+                status = 'done'
+            except Exception as e:
+                stage['error'] = repr(e)
+                status = 'failed'
+            with self.lock:
+                stage['status'] = status
+                stage['seconds'] = time.perf_counter() - start
+            print(f"{name}: {status} in {stage['seconds']:.1f} s")
+
+    def ready(self, name):
+        '''
+        True once the stage is done, stages that were never added are always ready
+        '''
+        return name not in self.stages or self.stages[name]['status'] == 'done'
+
+    def status(self):
+        with self.lock:
+            return [{'stage': name, 'status': i['status'], 'done': i['done'], 'total': i['total'],
+                     'seconds': i['seconds'], 'error': i['error']} for name, i in self.stages.items()]
+
+
+PRECOMPUTE = Precompute()
+
+#Rendered pages, set to a store on disk by serve.py so that several server processes share one build
+ARTIFACTS = ArtifactStore()
+
+
+def placeholder(name):
+    '''
+    Shown instead of a page whose stage is not done yet
+    '''
+    stage = PRECOMPUTE.stages[name]
+    if stage['status'] == 'failed':
+        return dbc.Alert(f"{name} could not be built: {stage['error']}", color="danger")
+    return dbc.Alert([f"{name} is still being prepared ({stage['done']}/{stage['total']}), reload the page in a moment. ",
+                      html.A("Progress", href="/status")], color="info")
+
+#Cytoscape elements of the graphs. The year graphs are keyed by the digest of their edges so that a refresh of
+#the corpus only recomputes the years it changed, the other graphs by the fingerprint of the corpus
+ELEMENTS = None
+
+
+def get_elements():
+    global ELEMENTS
+    if ELEMENTS is None:
+        ELEMENTS = ElementStore(corpus_fingerprint())
+    return ELEMENTS
+
+YEAR_NODES_DATA = ['size', 'betweenness', 'degree_centrality',
+                   'closeness_centrality', 'eigenvector_centrality', 'degree', 'clustering']
+
+
+def yearElements(Year, cumulative=False):
+    '''
+    Elements of the graph of the year or of the cumulative graph, the centralities and the layout are only computed when they are not stored
+    '''
+    kind = 'cumulative' if cumulative else 'year'
+    key = f"year-{Year.year}-{kind}-{Year.sweep.digest(kind, Year.year)}-{Year.seed}-{Year.approximate}"
+
+    def build():
+        Year.load()
+        if cumulative:
+            return graph_elements(Year.graph_previous_years, YEAR_NODES_DATA, node_size=2)
+        return graph_elements(Year.graph_year, YEAR_NODES_DATA)
+    return get_elements().get(key, build)
+
+
+def subsetElements(names, year, graph, nodes_data):
+    '''
+    Elements of one graph of get_faculty_subset(names, year), graph is a year or 'all' for the cumulative graph
+    '''
+    members = sorted(names.items()) if isinstance(names, dict) else sorted(names)
+    key = f"subset-{get_elements().version}-{members}-{year}-{graph}-{nodes_data}"
+
+    def build():
+        subset = get_faculty_subset(names, year=year)
+        G = subset.graph_year_all if graph == 'all' else subset.graph_years[graph]
+        return graph_elements(G, nodes_data)
+    return get_elements().get(key, build)
+
+
 def initialize_layout():
     '''
     Method to intialize the layout for the app including the sidebar and the creation of the div on the right
@@ -151,7 +285,8 @@ def initialize_layout():
                                     href="/areas", active="exact"),
                         dbc.NavLink("Analysis on excellence Node",
                                     href="/excellence", active="exact"),
-                        dbc.NavLink("New Hire", href="/hire", active="exact")
+                        dbc.NavLink("New Hire", href="/hire", active="exact"),
+                        dbc.NavLink("Status", href="/status", active="exact")
                     ],
                     vertical=True,
                     pills=True,
@@ -163,36 +298,21 @@ def initialize_layout():
 
     sidebar = createSidebar()
     content = html.Div(id="page-content", style=CONTENT_STYLE)
+
     app.layout = html.Div([dcc.Location(id="url"), sidebar, content])
     return
 
 
-def generateGraph(G, cytoscape_id, nodes_data=None, size="600px",size_by = 'degree', node_size=5, edge_size=0.3, stylesheet=None, layout='cose-bilkent'):
-    def getNodes():
-        nodes = []
-        for node in G.nodes():
-            temp = {'id': node, 'label': node}
-            if nodes_data != None:
-                for i in nodes_data:
-                    if i == 'size':
-                        if G.nodes[node][size_by] < 1000:
-                            temp[i] = f"{G.nodes[node][size_by] * node_size + node_size}%"
-                        else:
-                            temp[i] = f"15%"
-                    else:
-                        temp[i] = G.nodes[node][i]
-            nodes.append({'data': temp})
-        return nodes
-
-    def getEdges():
-        edges = []
-        for edge in G.edges():
-            edges.append({
-                'data': {'source': edge[0], 'target': edge[1], 'edge_size': edge_size}
-            })
-        return edges
-
-    nodes, edges = getNodes(), getEdges()
+def generateGraph(G, cytoscape_id, nodes_data=None, size="600px",size_by = 'degree', node_size=5, edge_size=0.3, stylesheet=None, layout=None, elements=None):
+    '''
+    elements are the precomputed output of graph_elements for G, G is only read when they are not given.
+    Without a layout the positions computed on the server are used as they are (preset), cose-bilkent runs in the browser for graphs without them
+    '''
+    if elements is None:
+        elements = graph_elements(G, nodes_data, size_by, node_size, edge_size)
+
+    if layout is None:
+        layout = 'preset' if has_positions(elements) else 'cose-bilkent'
 
     width = size
     height = size
@@ -205,7 +325,7 @@ def generateGraph(G, cytoscape_id, nodes_data=None, size="600px",size_by = 'degr
         id=cytoscape_id,
         layout={'name': layout},
         style={'width': width, 'height': height},
-        elements=edges + nodes,
+        elements=elements,
         stylesheet=stylesheet)
     return graph
 
@@ -278,17 +398,13 @@ def buildYearContent(Year):
         return dcc.Graph(figure=fig)
 
     def buildYearGraph():
-        nodes_data = ['size', 'betweenness', 'degree_centrality',
-                      'closeness_centrality', 'eigenvector_centrality', 'degree', 'clustering']
         network_graph = generateGraph(
-            network, "year-graph", nodes_data=nodes_data, stylesheet=YEAR_GRAPH_STYLESHEET)
+            network, "year-graph", stylesheet=YEAR_GRAPH_STYLESHEET, elements=yearElements(Year))
         return network_graph
 
     def buildCummulative():
-        nodes_data = ['size', 'betweenness', 'degree_centrality',
-                      'closeness_centrality', 'eigenvector_centrality', 'degree', 'clustering']
         network_graph = generateGraph(network_overall, "cummulative-year-graph",
-                                      node_size=2, nodes_data=nodes_data, stylesheet=YEAR_GRAPH_STYLESHEET)
+                                      stylesheet=YEAR_GRAPH_STYLESHEET, elements=yearElements(Year, cumulative=True))
         return network_graph
 
     def buildConnectedComponent():
@@ -320,13 +436,25 @@ def buildYearContent(Year):
     return html.Div(output_list)
 
 
-def buildYear(year):
-    global YEAR
-    for i in range(2000, 2022):
-        YEAR[i] = buildYearContent(year[int(i)])
+def buildYear(year, lazy=True):
+    '''
+    Keeps the Year objects, the content of a year is only built the first time it is requested unless lazy is False
+    '''
+    global YEARS
+    YEARS = year
+    if not lazy:
+        for i in range(2000, 2022):
+            getYearContent(i)
     return
 
 
+def getYearContent(value):
+    with RENDER_LOCK:
+        if value not in YEAR:
+            YEAR[value] = ARTIFACTS.get(f"year-{value}", lambda: buildYearContent(YEARS[value]))
+    return YEAR[value]
+
+
 def buildOverall(year):
     global OVERALL_GRAPHS
 
@@ -383,7 +511,7 @@ def facultyContent():
     year_option = [{'label': i, 'value': i} for i in range(2000, 2022)]
     option = []
 
-    for i in pd.read_csv("Faculty.csv")['Faculty'].to_list():
+    for i in FACULTY_LIST:
         option.append({'label': i, 'value': i})
 
     return html.Div([
@@ -402,6 +530,8 @@ def facultyContent():
 
 def facultySubsetContent(value, year_value):
     year_value = int(year_value)
+    if type(value) == str:
+        value = [value]
 
     def faculty_grid(faculty):
         def generateList():
@@ -430,11 +560,12 @@ def facultySubsetContent(value, year_value):
         ])
         return out
 
-    facultySubset = FacultySubset(value)
+    facultySubset = get_faculty_subset(value, year = year_value)
     overall_graph = generateGraph(facultySubset.graph_years[int(year_value)], "faculty-subset-graph",
                                   nodes_data=['color'], stylesheet=FACULTY_GRAPH_STYLESHEET)
     l = []
-    for i in facultySubset.faculty:
+    #The cached subset may have been built from the same names in another order
+    for i in value:
         l.append(faculty_grid(facultySubset.faculty[i]))
 
     return html.Div([dbc.Col(overall_graph), dbc.Col(l)])
@@ -442,37 +573,40 @@ def facultySubsetContent(value, year_value):
 
 def createOverallPage():
     global OVERALL_GRAPHS
-    return html.Div([
-        OVERALL_GRAPHS['Average Degree'],
-        OVERALL_GRAPHS['Average Clustering Coefficient']
-    ])
+
+    def build():
+        with RENDER_LOCK:
+            if not OVERALL_GRAPHS:
+                buildOverall(YEARS)
+        return html.Div([
+            OVERALL_GRAPHS['Average Degree'],
+            OVERALL_GRAPHS['Average Clustering Coefficient']
+        ])
+    return ARTIFACTS.get("overall", build)
 
 
 @app.callback(Output("yearContent", "children"), Input("year_id", "value"))
 def render_year_graph(value):
-    return YEAR[int(value)]
-
-
-click = 0
-
+    return getYearContent(int(value))
 
-@app.callback(Output("faculty-subset", "children"), [Input("Faculty", "value"), Input("submit-val", "n_clicks"), Input("year_id_faculty_subset", "value")])
-def render_faculty(value, n_clicks, year_value):
 
-    global FACULTY_SUBSET
-    global click
-
-    if n_clicks != click:
-        FACULTY_SUBSET = facultySubsetContent(value, year_value)
-        click = n_clicks
-
-    return FACULTY_SUBSET
+@app.callback(Output("faculty-subset", "children"), Input("submit-val", "n_clicks"), [State("Faculty", "value"), State("year_id_faculty_subset", "value")])
+def render_faculty(n_clicks, value, year_value):
+    '''
+    The content only changes on submit. The browser sends the selection with the click,
+    so any server process answers it the same way
+    '''
+    if not n_clicks:
+        return None
+    names = (value,) if type(value) == str else tuple(value or ())
+    key = (names, int(year_value))
+    return FACULTY_RESULTS.get(key, lambda: facultySubsetContent(list(names), key[1]))
 
 
 def buildGraphsContent(names, year, position):
-    facultySubset = FacultySubset(names,year = year)
-    graph = generateGraph(facultySubset.graph_years[int(year)], f"{position}-subset-graph",
-                          nodes_data=['color'], size="300px", stylesheet=FACULTY_GRAPH_STYLESHEET)
+    elements = subsetElements(names, year, int(year), ['color'])
+    graph = generateGraph(None, f"{position}-subset-graph", size="300px",
+                          stylesheet=FACULTY_GRAPH_STYLESHEET, elements=elements)
     return graph
 
 def displayNameDegree(data):
@@ -542,12 +676,17 @@ def all_rank_info(data):
 
 @app.callback(Output("ranks-content", "children"), Input("ranks_year_id", "value"))
 def render_rank_year_graph(value):
+    return ARTIFACTS.get(f"ranks-{int(value)}", lambda: rankContent(value))
+
+
+def rankContent(value):
+    groups = get_groups()
     positions = {
-        'lecturers': ["Lecturers", LECT.nodes],
-        'senior_lecturers': ["Senior Lecturers", SLECT.nodes],
-        'assistant': ["Assistant Professors", ASST.nodes],
-        'assosicate': ["Associate Professors", ASSOC.nodes],
-        'professors': ["Professors", PROF.nodes]
+        'lecturers': ["Lecturers", groups['Lecturer'].nodes],
+        'senior_lecturers': ["Senior Lecturers", groups['Senior Lecturer'].nodes],
+        'assistant': ["Assistant Professors", groups['Assistant Professor'].nodes],
+        'assosicate': ["Associate Professors", groups['Associate Professor'].nodes],
+        'professors': ["Professors", groups['Professor'].nodes]
     }
 
     def build_names_list(names):
@@ -558,15 +697,15 @@ def render_rank_year_graph(value):
 
     def get_position_list():
         temp = {}
-        for i in LECT.nodes:
+        for i in groups['Lecturer'].nodes:
             temp[i] = 'blue'
-        for i in SLECT.nodes:
+        for i in groups['Senior Lecturer'].nodes:
             temp[i] = 'green'
-        for i in ASST.nodes:
+        for i in groups['Assistant Professor'].nodes:
             temp[i] = 'blue'
-        for i in ASSOC.nodes:
+        for i in groups['Associate Professor'].nodes:
             temp[i] = 'pink'
-        for i in PROF.nodes:
+        for i in groups['Professor'].nodes:
             temp[i] = 'purple'
      
         return temp
@@ -585,8 +724,8 @@ def render_rank_year_graph(value):
             html.Br()
         ]))
     
-    all_names = FacultySubset(get_position_list())
-    all_rank_graph = dbc.Row([generateGraph(all_names.graph_years[int(value)],"all-faculty-rank", nodes_data=['color','degree'],stylesheet=FACULTY_GRAPH_STYLESHEET),
+    all_names = subsetElements(get_position_list(), int(value), int(value), ['color', 'degree'])
+    all_rank_graph = dbc.Row([generateGraph(None,"all-faculty-rank",stylesheet=FACULTY_GRAPH_STYLESHEET, elements=all_names),
                                 html.Div(id = "all-rank")], align = "center")
 
     output_list = [all_rank_graph] + output_list
@@ -615,29 +754,32 @@ def professors_info(data):
 
 def buildManagement():
     global MANAGEMENT_GRAPH
-    global MANAGE    
+    #The groups are only built when a page is missing from the store
     temp = {}
-    for i in MANAGE.names:
-        if i in MANAGE.nodes:
-            temp[i] = 'yellow'
-        else:
-            temp[i] = 'black'
-    t = FacultySubset(temp)
-    for i in range(2000,2022):        
-        MANAGEMENT_GRAPH[i] = html.Div([dbc.Row(
-            [generateGraph(t.graph_years[i],f"management-graph",nodes_data=['color', "degree"], stylesheet=FACULTY_GRAPH_STYLESHEET),
+    def build(i):
+        if not temp:
+            MANAGE = get_groups()['manage']
+            for j in MANAGE.names:
+                temp[j] = 'yellow' if j in MANAGE.nodes else 'black'
+        return html.Div([dbc.Row(
+            [generateGraph(None,f"management-graph", stylesheet=FACULTY_GRAPH_STYLESHEET, elements=subsetElements(temp, None, i, ['color', "degree"])),
             html.Div(id = 'management-information')
             ], align = "center"),
             html.H4("Cummulative Collaborative Graph till 2021"),
             dbc.Row([
-                    generateGraph(t.graph_year_all,"management-graph-all",nodes_data=['color', "degree"], stylesheet=FACULTY_GRAPH_STYLESHEET),
+                    generateGraph(None,"management-graph-all", stylesheet=FACULTY_GRAPH_STYLESHEET, elements=subsetElements(temp, None, 'all', ['color', "degree"])),
                     html.Div(id = 'management-information-all')
                 ], align = "center")
             ])
 
+    for i in range(2000,2022):
+        MANAGEMENT_GRAPH[i] = ARTIFACTS.get(f"management-{i}", lambda: build(i))
+
 @app.callback(Output("management-content", "children"), Input("management_year_id", "value"))
 def managementContent(value):
     global MANAGEMENT_GRAPH
+    if not PRECOMPUTE.ready("Management"):
+        return placeholder("Management")
     return MANAGEMENT_GRAPH[int(value)]
 
 def createPosition():
@@ -659,8 +801,8 @@ def professors_info(data):
 
 @app.callback(Output("area-content", "children"), Input("area1", "value"), Input('area2', 'value'))
 def areaContent(area1, area2):
-    g1=AREA[area1]
-    g2=AREA[area2]
+    g1=get_groups()['areas'][area1]
+    g2=get_groups()['areas'][area2]
     
     temp={}
     
@@ -670,12 +812,13 @@ def areaContent(area1, area2):
     for i in g2.nodes:
         temp[i]= 'red'
         
-    t=FacultySubset(temp)
+    #Only the cumulative graph is shown, it is built with the year 2021
+    elements = subsetElements(temp, 2021, 'all', ['color', "degree"])
     
     return html.Div([
             html.H4("Inter-Group Collaborations"),
             dbc.Row([
-                    generateGraph(t.graph_year_all,"area-graph-all",nodes_data=['color', "degree"], stylesheet=FACULTY_GRAPH_STYLESHEET),
+                    generateGraph(None,"area-graph-all", stylesheet=FACULTY_GRAPH_STYLESHEET, elements=elements),
                     html.Div(id = 'area-information-all')
                 ], align = "center")
             ])
@@ -707,6 +850,7 @@ def professors_info(data):
     return displayNameDegree(data)
 
 def createExcellence():
+    EXC = get_groups()['excellence']
     temp={}
     
     for i in EXC.names:
@@ -715,12 +859,12 @@ def createExcellence():
         else:
             temp[i] = 'black'
             
-    t=FacultySubset(temp)
+    elements = subsetElements(temp, 2021, 'all', ['color', "degree"])
     
     return (html.Div([
             html.H4("Excellence Nodes"),
             dbc.Row([
-                    generateGraph(t.graph_year_all,"excellence-graph",nodes_data=['color', "degree"], stylesheet=FACULTY_GRAPH_STYLESHEET),
+                    generateGraph(None,"excellence-graph", stylesheet=FACULTY_GRAPH_STYLESHEET, elements=elements),
                     html.Div(id = 'excellence-information')
                 ], align = "center")
             , html.Div(id="excellence-content")]))
@@ -728,15 +872,15 @@ def createExcellence():
 
 def buildHire():
     global HIRE
+    HIRE = ARTIFACTS.get("hire", hireContent)
+    return
+
+
+def hireContent():
     hire = Hire()
     def getDegreeDistribution():
-        hist = Counter(sorted([i[1] for i in nx.degree(hire.graph)]))
-        total = hire.graph.number_of_nodes()
-        l1, l2 = [], []
-        for i in hist:
-            l1.append(i)
-            l2.append(hist[i] / total)
-        df = pd.DataFrame.from_dict({'Degree': l1, 'Probability': l2})
+        df = pd.DataFrame.from_dict({'Degree': list(hire.degree_distribution),
+                                     'Probability': list(hire.degree_distribution.values())})
         fig = px.line(df, x="Degree", y="Probability",
                       title='Degree Distribution', log_y=True)
         return dcc.Graph(figure=fig)
@@ -775,15 +919,45 @@ def buildHire():
             dbc.Row([graph2,html.Div(id='hire-degree-node-output')], align='center')
         ])               
     ])
-    HIRE = temp
-    return
+    return temp
 
 
 def newHire():
     global HIRE
+    if not PRECOMPUTE.ready("Hire"):
+        return placeholder("Hire")
     return HIRE
 
 
+def statusTable():
+    table_header = [html.Thead(
+        html.Tr([html.Th("Stage"), html.Th("Status"), html.Th("Progress"), html.Th("Time (s)")]))]
+    l = []
+    for i in PRECOMPUTE.status():
+        seconds = "" if i['seconds'] is None else f"{i['seconds']:.1f}"
+        status = i['status'] if i['error'] is None else f"{i['status']}: {i['error']}"
+        l.append(html.Tr([html.Td(i['stage']), html.Td(status), html.Td(f"{i['done']}/{i['total']}"), html.Td(seconds)]))
+    return dbc.Table(table_header + [html.Tbody(l)], bordered=True, hover=True, responsive=True, striped=True)
+
+
+def createStatusPage():
+    return html.Div([
+        html.H4("Precomputation"),
+        html.Div(statusTable(), id="status-table"),
+        dcc.Interval(id="status-interval", interval=1000)
+    ])
+
+
+@app.callback(Output("status-table", "children"), Input("status-interval", "n_intervals"))
+def refreshStatus(n):
+    return statusTable()
+
+
+@app.server.route("/status.json")
+def statusJson():
+    return jsonify(PRECOMPUTE.status())
+
+
 @app.callback(Output("page-content", "children"), [Input("url", "pathname")])
 def render_page_content(pathname):
     if pathname == "/":
@@ -804,6 +978,8 @@ def render_page_content(pathname):
         return createExcellence()
     elif pathname == '/hire':
         return newHire()
+    elif pathname == '/status':
+        return createStatusPage()
     return dbc.Jumbotron(
         [
             html.H1("404: Not found", className="text-danger"),
@@ -813,17 +989,23 @@ def render_page_content(pathname):
     )
 
 
-def getApp(year):
+def getApp(year, lazy=True, background=True):
+    '''
+    With background the server starts at once and the pages are built by PRECOMPUTE, see /status.
+    Unless lazy the content of every year and the overall page are built as well
+    '''
     global app
-    print("Building Year Graph...")
     buildYear(year)
-    print("Building Overall Graph...")
-    buildOverall(year)
-    print("Building Hire informations")
-    buildHire()
-    print("Building Management")
-    buildManagement()
+    PRECOMPUTE.add("Management", buildManagement)
+    PRECOMPUTE.add("Hire", buildHire)
+    if not lazy:
+        PRECOMPUTE.add("Year pages", getYearContent, list(range(2000, 2022)))
+        PRECOMPUTE.add("Overall", createOverallPage)
     print("Initializing...")
     initialize_layout()
 
+    if background:
+        PRECOMPUTE.start()
+    else:
+        PRECOMPUTE.run()
     return app
@@ -0,0 +1,92 @@
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+#Callback each page sends to the server: output, input and the value of the input
+PAGES = {
+    'year': ("yearContent", "year_id", "value", 2010),
+    'overall': ("page-content", "url", "pathname", "/overall"),
+    'ranks': ("ranks-content", "ranks_year_id", "value", 2010),
+    'management': ("management-content", "management_year_id", "value", 2010),
+    'areas': ("area-content", "area1", "value", "HCI"),
+    'hire': ("page-content", "url", "pathname", "/hire"),
+}
+
+
+def callback_payload(output, input_id, prop, value):
+    '''
+    Body of the request Dash sends when the input changes
+    '''
+    inputs = [{'id': input_id, 'property': prop, 'value': value}]
+    if input_id == "area1":
+        inputs.append({'id': "area2", 'property': "value", 'value': "AI/ML"})
+    return json.dumps({
+        'output': f"{output}.children",
+        'outputs': {'id': output, 'property': "children"},
+        'inputs': inputs,
+        'changedPropIds': [f"{input_id}.{prop}"]
+    }).encode()
+
+
+def request(url, body):
+    start = time.perf_counter()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': "application/json"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def load_test(base, page, requests, concurrency):
+    '''
+    Sends the callback of the page requests times from concurrency clients, returns req/s and the latencies in ms
+    '''
+    body = callback_payload(*PAGES[page])
+    url = base.rstrip("/") + "/_dash-update-component"
+    request(url, body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: request(url, body), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = numpy.array([i[0] for i in results]) * 1000
+    errors = sum(i[1] != 200 for i in results)
+    return {
+        'page': page,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': int(errors),
+        'rps': requests / elapsed,
+        'p50_ms': float(numpy.percentile(latencies, 50)),
+        'p95_ms': float(numpy.percentile(latencies, 95)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the pages of a running server")
+    parser.add_argument("--url", default="http://127.0.0.1:8050")
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), choices=list(PAGES))
+    parser.add_argument("--requests", type=int, default=200, help="requests per page")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'Page':>12} {'req/s':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'Errors':>7}")
+    for page in args.pages:
+        r = load_test(args.url, page, args.requests, args.concurrency)
+        results.append(r)
+        print(f"{page:>12} {r['rps']:>8.1f} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} {r['errors']:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
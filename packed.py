@@ -0,0 +1,251 @@
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+
+#gzip level of the members, 6 is the default of gzip itself
+LEVEL = 6
+
+
+def write_atomic(path, content):
+    '''
+    Writes the bytes into path through a temporary file of its own renamed into place once complete,
+    readers never see a partly written file and processes writing the same path at once do not collide
+    '''
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        os.chmod(tmp, 0o644)
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class Pack:
+    '''
+    The xml files of a folder packed into one file, every file is a gzip member appended to FOLDER.pack.
+    FOLDER.pack.json indexes each name with the offset and length of its member and the size and sha1 of the file,
+    a member is read with a single pread and decompressed in memory, nothing is extracted to disk.
+    A file written again is appended and the old member is left in place until compact
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".json"
+        self.members = {}
+        self.lock = threading.Lock()
+        self.fd = None
+        self.loaded = None
+        self.load()
+
+    def load(self):
+        self.close()
+        if os.path.exists(self.index_path):
+            self.loaded = os.stat(self.index_path).st_mtime_ns
+            with open(self.index_path) as file:
+                self.members = json.load(file)
+        else:
+            self.loaded = None
+            self.members = {}
+
+    def stale(self):
+        '''
+        True if the index was saved again by another process since it was loaded
+        '''
+        mtime = os.stat(self.index_path).st_mtime_ns if os.path.exists(self.index_path) else None
+        return mtime != self.loaded
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def names(self):
+        return list(self.members)
+
+    def stat(self, name):
+        '''
+        Offset and length of the member, they change whenever the file is written again
+        '''
+        offset, length, size, sha1 = self.members[name]
+        return offset, length
+
+    def size(self, name):
+        '''
+        Size of the file before compression, None if it is not in the pack
+        '''
+        return self.members[name][2] if name in self.members else None
+
+    def sha1(self, name):
+        return self.members[name][3]
+
+    def read(self, name):
+        offset, length, size, sha1 = self.members[name]
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDONLY)
+        return gzip.decompress(os.pread(self.fd, length, offset))
+
+    def open(self, name):
+        return io.BytesIO(self.read(name))
+
+    def write(self, name, content):
+        '''
+        Appends the file as a new member, the index only points to it once saved
+        '''
+        member = gzip.compress(content, LEVEL, mtime=0)
+        with self.lock:
+            with open(self.path, 'ab') as file:
+                offset = file.tell()
+                file.write(member)
+            self.members[name] = [offset, len(member), len(content), hashlib.sha1(content).hexdigest()]
+
+    def save(self):
+        with self.lock:
+            write_atomic(self.index_path, json.dumps(self.members).encode())
+            self.loaded = os.stat(self.index_path).st_mtime_ns
+
+    def garbage(self):
+        '''
+        Bytes of the pack taken by members that were written again
+        '''
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) - sum(i[1] for i in self.members.values())
+
+    def compact(self):
+        '''
+        Rewrites the pack with only the members of the index. Readers holding the old pack open keep reading it
+        until they load the new index
+        '''
+        with self.lock:
+            members = {}
+            with open(self.path + ".tmp", 'wb') as file:
+                for name, (offset, length, size, sha1) in self.members.items():
+                    if self.fd is None:
+                        self.fd = os.open(self.path, os.O_RDONLY)
+                    members[name] = [file.tell(), length, size, sha1]
+                    file.write(os.pread(self.fd, length, offset))
+            self.close()
+            os.replace(self.path + ".tmp", self.path)
+            self.members = members
+        self.save()
+
+
+class Folder:
+    '''
+    Plain folder of xml files with the write side of Pack, used by fetchData when the files are not packed
+    '''
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def file(self, name):
+        return f"{self.path}/{name}.xml"
+
+    def size(self, name):
+        return os.path.getsize(self.file(name)) if os.path.exists(self.file(name)) else None
+
+    def write(self, name, content):
+        write_atomic(self.file(name), content)
+
+    def save(self):
+        return
+
+
+def pack_path(folder):
+    return folder.rstrip("/") + ".pack"
+
+
+PACKS = {}
+
+def get_pack(folder):
+    '''
+    Pack of the folder, None if it was never packed. It is loaded again when another process saved it
+    '''
+    path = pack_path(folder)
+    pack = PACKS.get(path)
+    if pack is None:
+        if not os.path.exists(path + ".json"):
+            return None
+        pack = PACKS[path] = Pack(path)
+    elif pack.stale():
+        pack.load()
+    return pack
+
+
+def find(path):
+    '''
+    Pack and name of the xml file at path when it is only in the pack of its folder, None when the file is on disk.
+    A file on disk is always read before the packed copy
+    '''
+    if os.path.exists(path):
+        return None
+    folder, name = os.path.split(path)
+    pack = get_pack(folder)
+    name = name[:name.rfind(".")]
+    if pack is None or name not in pack:
+        return None
+    return pack, name
+
+
+def list_names(folder):
+    '''
+    Names of the xml files of the folder and of its pack, either may be missing.
+    Other files, like the .tmp of an interrupted write, are left out
+    '''
+    names = [i[:-len(".xml")] for i in os.listdir(folder) if i.endswith(".xml")] if os.path.isdir(folder) else []
+    pack = get_pack(folder)
+    if pack is not None:
+        seen = set(names)
+        names += [i for i in pack.names() if i not in seen]
+    return names
+
+
+def pack_folder(folder, remove=False):
+    '''
+    Packs every xml file of the folder, with remove the files are deleted once the index is saved
+    '''
+    pack = Pack(pack_path(folder))
+    names = [i[:i.rfind(".")] for i in sorted(os.listdir(folder)) if i.endswith(".xml")]
+    for name in names:
+        with open(f"{folder}/{name}.xml", 'rb') as file:
+            pack.write(name, file.read())
+    pack.save()
+    if remove:
+        for name in names:
+            os.remove(f"{folder}/{name}.xml")
+    return pack
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packs the xml files of a folder into FOLDER.pack")
+    parser.add_argument("command", choices=["pack", "unpack", "compact", "info"])
+    parser.add_argument("folder", nargs="?", default="./AdditionalData")
+    parser.add_argument("--remove", action="store_true", help="delete the xml files once they are packed")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        pack = pack_folder(args.folder, args.remove)
+    else:
+        pack = get_pack(args.folder)
+        if pack is None:
+            raise SystemExit(f"{pack_path(args.folder)} does not exist")
+    if args.command == "unpack":
+        folder = Folder(args.folder)
+        for name in pack.names():
+            folder.write(name, pack.read(name))
+    elif args.command == "compact":
+        pack.compact()
+
+    size = sum(i[2] for i in pack.members.values())
+    packed = os.path.getsize(pack.path)
+    print(f"{len(pack.members)} files, {size / 1e6:.1f} MB in {packed / 1e6:.1f} MB "
+          f"({pack.garbage() / 1e6:.1f} MB of old members)")
@@ -1,15 +1,31 @@
 import xml.etree.ElementTree as ET
+import hashlib
 import os
+import tempfile
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 import pickle
 
+from corpus import Corpus, Excellence
+from packed import find, list_names, write_atomic
+
+#Faculty.csv is read once, FACULTY_LIST keeps the order of the file and FACULTY_INFO the row of each faculty
 FACULTY_DF = pd.read_csv("Faculty.csv")
+FACULTY_LIST = FACULTY_DF['Faculty'].to_list()
+FACULTY_INFO = FACULTY_DF.set_index('Faculty').to_dict('index')
 FACULTY_PID = {}
 ADDITIONAL_NAMES = {}
 
-NAMES = [i[:i.rfind(".")] for i in (os.listdir("./Data"))]
+#Number of processes used to parse the xml files and the number of files handed to a process at a time
+WORKERS = int(os.environ.get("NS_WORKERS", 1))
+CHUNKSIZE = int(os.environ.get("NS_CHUNKSIZE", 16))
+
+#Directory of the records parsed from Data and AdditionalData, one file per folder. An empty value turns the cache off
+CACHE_PATH = os.environ.get("NS_CACHE", "./cache/corpus")
+
+NAMES = list_names("./Data")
 
 top=[
     'nips','sigmod',
@@ -20,48 +36,91 @@ top=[
     'podc', 'siggraph',
     'recomb', 'mm']
 
+#Excellence of the SCSE faculty: at least 8 papers in the top venues since 2010,
+#and of the people of AdditionalData: their number of papers in the top venues since 2018
+FACULTY_EXCELLENCE = Excellence(top, start=2010, threshold=8)
+PERSON_EXCELLENCE = Excellence(top, start=2018)
+
+PAPER_TYPES = {"article": "journal", "inproceedings": "conference"}
+
+def conference(crossref):
+    '''
+    Returns the conference of the crossref, None if it is not a conference or if it is a workshop paper
+    '''
+    if(crossref is not None and crossref[:5]=='conf/' and crossref[-1]!='w'):
+        return crossref[5:crossref.index('/', 5, -1)]
+    return None
+
+def author_name(text):
+    '''
+    Removes the dblp homonym number from the name of the author
+    '''
+    return ''.join([i for i in text if not i.isdigit()])
+
+def read_record(r):
+    '''
+    Copies out the fields used by the project from a <r> element so that the element can be cleared
+    '''
+    record = {'tag': None, 'title': None, 'year': None, 'authors': [], 'crossref': None}
+    for x in r.iter():
+        if x.tag in ("article", "inproceedings"):
+            record['tag'] = x.tag
+        elif x.tag == "author":
+            record['authors'].append((author_name(x.text), x.attrib.get('pid')))
+        elif x.tag == "year":
+            record['year'] = (int)(x.text)
+        elif x.tag == "title":
+            record['title'] = x.text
+        elif x.tag == "crossref":
+            record['crossref'] = x.text
+    return record
+
+def iter_records(xml_path):
+    '''
+    Streams the papers of a dblp person file one <r> record at a time.
+    Every direct child of the root is cleared once it is read so only the current record is kept in memory
+    '''
+    with open_source(xml_path) as file:
+        depth = 0
+        root = None
+        for event, x in ET.iterparse(file, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = x
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if x.tag == 'r':
+                    yield read_record(x)
+                root.clear()
+
 class PublishedPaper:
-    def __init__(self, xml_raw):
-        
-        self.xml_raw = xml_raw 
+    def __init__(self, record):
 
         self.authors = []
         self.title = None
         self.year = None
         self.paper_type = None    
+        self.venue = None
 
         self.temp_list = {}
 
-        self.excellentPaper = False   
-
-        self.fetch_info() 
+        self.fetch_info(record) 
         self.checkAdd()
         
-    def fetch_info(self):
-        for x in self.xml_raw.iter():
-            if x.tag == "article":
-                self.paper_type = "journal"
-            elif x.tag == "inproceedings":
-                self.paper_type = "conference"            
-            if x.tag == "author":
-                try:
-                    if (x.attrib['pid']) not in FACULTY_PID.keys():
-                        author_name = ''.join([i for i in (x.text) if not i.isdigit()])
-                        self.temp_list[author_name] = x.attrib['pid']
-                    self.authors.append(FACULTY_PID[x.attrib['pid']])                                            
-                except Exception as e:                    
-                    author_name = (x.text)
-                    author_name = ''.join([i for i in author_name if not i.isdigit()])                                           
-                    self.authors.append(author_name)
-            elif x.tag == "year":
-                self.year = (int)(x.text)
-            elif x.tag == "title":
-                self.title = x.text 
-
-            #Check to see if it is a conference as well as not a workshop paper
-            if(x.tag=='crossref' and x.text[:5]=='conf/' and x.text[-1]!='w'):
-                if(x.text[5:x.text.index('/', 5, -1)] in top):
-                    self.excellentPaper=True  
+    def fetch_info(self, record):
+        self.paper_type = PAPER_TYPES.get(record['tag'])
+        for name, pid in record['authors']:
+            if pid in FACULTY_PID:
+                self.authors.append(FACULTY_PID[pid])
+            else:
+                if pid is not None:
+                    self.temp_list[name] = pid
+                self.authors.append(name)
+        self.year = record['year']
+        self.title = record['title']
+        self.venue = conference(record['crossref'])
 
     def checkAdd(self):
         global ADDITIONAL_NAMES
@@ -73,16 +132,16 @@ class PublishedPaper:
        
 class Faculty:    
     
-    excellenceThreshold=8
+    excellenceThreshold=FACULTY_EXCELLENCE.threshold
 
-    def __init__(self,name):      
+    def __init__(self, name, records=None, excellence=None):      
 
         self.position = None
         self.gender = None
         self.managment = None
-        self.xml = None
         self.area = None
 
+        self.excellence = 0
         self.excellenceNode = False
 
         self.papers = []
@@ -91,43 +150,40 @@ class Faculty:
         self.xml_path = f"./Data/{name}.xml"
 
         self.get_data_df()
-        self.load_xml()
-        self.parse_xml()
-        self.checkExcellence()
+        self.parse_xml(records)
+        if excellence is None:
+            self.checkExcellence()
+        else:
+            self.set_excellence(excellence)
 
         
-    def checkExcellence(self):
+    def checkExcellence(self, rule=FACULTY_EXCELLENCE):
         '''
-        Checks if the faculty qualifies as excellence node or not 
+        Checks if the faculty qualifies as excellence node or not, fetch_faculty scores every faculty at once instead
         '''  
-        excellence=0        
-        for x in self.papers:
-            if(x.year>=2010 and x.excellentPaper):
-                excellence+=1                
-        if(excellence>=Faculty.excellenceThreshold):
-            self.excellenceNode=True
+        self.set_excellence(rule.owner_scores(papers_corpus(self.name, self.papers), [self.name])[self.name], rule)
+
+    def set_excellence(self, excellence, rule=FACULTY_EXCELLENCE):
+        self.excellence = excellence
+        self.excellenceNode = excellence >= rule.threshold
         
     
     def get_data_df(self):
 
-        row = FACULTY_DF[FACULTY_DF["Faculty"]==self.name]
+        row = FACULTY_INFO[self.name]
 
-        self.gender = row.Gender.to_list()[0]
-        self.position = row.Position.to_list()[0]
-        self.managment = row.Management.to_list()[0]
-        self.area = row.Area.to_list()[0]
+        self.gender = row['Gender']
+        self.position = row['Position']
+        self.managment = row['Management']
+        self.area = row['Area']
 
         return
 
-    def load_xml(self):
-        self.xml = ET.parse(self.xml_path)
-        return
-    
-    def parse_xml(self):
-        root = self.xml.getroot()
-        for x in root:            
-            if(x.tag == 'r'):
-                self.papers.append(PublishedPaper(x))
+    def parse_xml(self, records=None):
+        if records is None:
+            records = iter_records(self.xml_path)
+        for record in records:
+            self.papers.append(PublishedPaper(record))
         return
 
     def printFaculty(self):
@@ -136,46 +192,28 @@ class Faculty:
 
 
 class PublishedPaperHire:
-    def __init__(self, xml_raw):
-        
-        self.xml_raw = xml_raw 
+    def __init__(self, record):
 
         self.authors = []
         self.title = None
         self.year = None
         self.paper_type = None     
+        self.venue = None
 
-        self.excellentPaper = False   
-
-        self.fetch_info() 
+        self.fetch_info(record) 
         
-    def fetch_info(self):
-        for x in self.xml_raw.iter():
-            if x.tag == "article":
-                self.paper_type = "journal"
-            elif x.tag == "inproceedings":
-                self.paper_type = "conference"            
-            if x.tag == "author":                        
-                author_name = (x.text)
-                author_name = ''.join([i for i in author_name if not i.isdigit()])                                           
-                self.authors.append(author_name)
-
-            elif x.tag == "year":
-                self.year = (int)(x.text)
-            elif x.tag == "title":
-                self.title = x.text 
-
-            #Check to see if it is a conference as well as not a workshop paper
-            if(x.tag=='crossref' and x.text[:5]=='conf/' and x.text[-1]!='w'):
-                if(x.text[5:x.text.index('/', 5, -1)] in top):
-                    self.excellentPaper=True  
+    def fetch_info(self, record):
+        self.paper_type = PAPER_TYPES.get(record['tag'])
+        self.authors = [name for name, pid in record['authors']]
+        self.year = record['year']
+        self.title = record['title']
+        self.venue = conference(record['crossref'])
 
 class Person:
-    def __init__(self, name):
+    def __init__(self, name, records=None, excellence=None):
         self.xml_path = f"./AdditionalData/{name}.xml"
 
-        self.xml = None
-
+        self.excellence = 0
         self.excellenceNode = False
         self.papers = []
 
@@ -183,50 +221,340 @@ class Person:
 
         self.name = name
         try:
-            self.load_xml()
-            self.parse_xml()
+            self.parse_xml(records)
         except Exception as e:
             self.store = False
             
-        self.checkExcellence()
+        if excellence is None:
+            self.checkExcellence()
+        else:
+            self.set_excellence(excellence)
             
-    def load_xml(self):
-        self.xml = ET.parse(self.xml_path)
-        return
-
-    def parse_xml(self):
-        root = self.xml.getroot()
-        for x in root:            
-            if(x.tag == 'r'):
-                self.papers.append(PublishedPaperHire(x))
+    def parse_xml(self, records=None):
+        if records is None:
+            records = iter_records(self.xml_path)
+        #Papers are only kept if the whole file could be read
+        self.papers = [PublishedPaperHire(record) for record in records]
         return
     
-    def checkExcellence(self):
+    def checkExcellence(self, rule=PERSON_EXCELLENCE):
         '''
-        Checks if the faculty qualifies as excellence node or not 
+        Number of excellent papers of the person, get_people scores every person at once instead
         '''  
-        excellence=0        
-        for x in self.papers:
-            if(x.year>=2018 and x.excellentPaper):
-                excellence+=1     
-        self.excellenceNode=excellence
-
-def get_people():
-    names = os.listdir("AdditionalData")
-    names = [i[:i.rfind(".")] for i in names]
+        self.set_excellence(rule.owner_scores(papers_corpus(self.name, self.papers), [self.name])[self.name], rule)
+
+    def set_excellence(self, excellence, rule=PERSON_EXCELLENCE):
+        self.excellence = excellence
+        self.excellenceNode = excellence
+
+def papers_corpus(owner, papers):
+    '''
+    Corpus of the papers of a single Faculty or Person, without their authors
+    '''
+    corpus = Corpus()
+    for x in papers:
+        corpus.add_paper(owner, x.year, x.paper_type, x.venue, [])
+    return corpus.finalize()
+
+def rescore(people, corpus, rule):
+    '''
+    Scores every Faculty or Person of people with the rule in one pass over the corpus of their papers,
+    no file is read again
+    '''
+    for name, score in rule.owner_scores(corpus, people).items():
+        people[name].set_excellence(score, rule)
+
+def parallel_map(func, items, workers=None, chunksize=None):
+    '''
+    Applies func to every item keeping the order of items.
+    With more than one worker the items are split in chunks over a process pool, workers=0 uses every core
+    '''
+    return list(parallel_iter(func, items, workers, chunksize))
+
+def parallel_iter(func, items, workers=None, chunksize=None):
+    '''
+    parallel_map yielding the results one at a time, in the order of items
+    '''
+    workers = WORKERS if workers is None else workers
+    chunksize = CHUNKSIZE if chunksize is None else chunksize
+    if workers == 0:
+        workers = os.cpu_count()
+
+    if workers <= 1:
+        for i in tqdm(items):
+            yield func(i)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from tqdm(executor.map(func, items, chunksize=chunksize), total=len(items))
+
+def open_source(path):
+    '''
+    Opens the xml file at path, from the pack of its folder when the file itself is not on disk
+    '''
+    packed = find(path)
+    if packed is None:
+        return open(path, 'rb')
+    pack, name = packed
+    return pack.open(name)
+
+def source_stat(path):
+    '''
+    mtime and size of the file, or offset and length of its member when it is packed
+    '''
+    packed = find(path)
+    if packed is None:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    pack, name = packed
+    return pack.stat(name)
+
+def file_hash(path):
+    packed = find(path)
+    if packed is not None:
+        pack, name = packed
+        return pack.sha1(name)
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+class CorpusCache:
+    '''
+    On-disk cache of the records read from the xml files of a folder.
+    CACHE_PATH/FOLDER.pkl holds the mtime, size and hash of every file and where its records are in CACHE_PATH/FOLDER.records,
+    the records of each file are pickled on their own so they are read back one file at a time and never kept by the cache.
+    An entry is reused while the mtime and size of its file are unchanged, or when they changed but the content hash did not.
+    Packed files are keyed by the same path, so an entry survives packing or unpacking the folder
+    '''
+    def __init__(self, folder, path=None):
+        path = CACHE_PATH if path is None else path
+        base = os.path.join(path, os.path.basename(os.path.normpath(folder))) if path else None
+        self.path = base + ".pkl" if path else None
+        self.records_path = base + ".records" if path else None
+        self.entries = {}
+        self.fd = None
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'rb') as file:
+                self.entries = pickle.load(file)
+
+    def get(self, xml_path):
+        '''
+        Returns the cached entry of the file or None if it has to be parsed again
+        '''
+        entry = self.entries.get(xml_path)
+        if entry is None:
+            return None
+        try:
+            stat = source_stat(xml_path)
+        except OSError:
+            return None
+        if (entry['mtime'], entry['size']) != stat:
+            if entry['hash'] != file_hash(xml_path):
+                return None
+            entry['mtime'], entry['size'] = stat
+            self.changed = True
+        return entry
+
+    def load(self, xml_path):
+        '''
+        Reads back the records of the entry, raises if they can not be read and the file has to be parsed again
+        '''
+        entry = self.entries[xml_path]
+        if self.fd is None:
+            self.fd = os.open(self.records_path, os.O_RDONLY)
+        path, records = pickle.loads(os.pread(self.fd, entry['length'], entry['offset']))
+        #Another process may have rewritten the file since the entries were read
+        if path != xml_path:
+            raise ValueError(f"{self.records_path} does not hold {xml_path} at {entry['offset']}")
+        return records
+
+    def put(self, xml_path, records):
+        '''
+        Appends the records of the file, nothing is kept when the cache is off or the file is gone
+        '''
+        if not self.path:
+            return
+        try:
+            mtime, size = source_stat(xml_path)
+            digest = file_hash(xml_path)
+        except OSError:
+            self.entries.pop(xml_path, None)
+            return
+        blob = pickle.dumps((xml_path, records), protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.records_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            offset = os.lseek(fd, 0, os.SEEK_END)
+            os.write(fd, blob)
+        finally:
+            os.close(fd)
+        self.entries[xml_path] = {'mtime': mtime, 'size': size, 'hash': digest, 'offset': offset, 'length': len(blob)}
+        self.changed = True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def garbage(self):
+        '''
+        Bytes of the records file taken by records no entry points to any more
+        '''
+        if not self.records_path or not os.path.exists(self.records_path):
+            return 0
+        return os.path.getsize(self.records_path) - sum(i['length'] for i in self.entries.values())
+
+    def compact(self):
+        '''
+        Rewrites the records file with only the records of the entries
+        '''
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as file:
+            for path, entry in list(self.entries.items()):
+                try:
+                    blob = pickle.dumps((path, self.load(path)), protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    del self.entries[path]
+                    continue
+                entry['offset'], entry['length'] = file.tell(), len(blob)
+                file.write(blob)
+        self.close()
+        os.replace(tmp, self.records_path)
+
+    def save(self):
+        if not self.path or not self.changed:
+            return
+        if self.garbage() > os.path.getsize(self.records_path) // 2:
+            self.compact()
+        write_pickle(self.path, self.entries)
+        self.changed = False
+
+    def report(self, hits, misses):
+        print(f"Corpus cache: {hits} hits, {misses} misses ({self.hits} hits, {self.misses} misses in total)")
+
+def write_pickle(path, value):
+    '''
+    Pickles the value into path, see write_atomic
+    '''
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_atomic(path, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+CACHES = {}
+
+def get_cache(folder):
+    '''
+    Cache of the folder, the ones of other folders are not read
+    '''
+    folder = os.path.normpath(folder)
+    if folder not in CACHES:
+        CACHES[folder] = CorpusCache(folder)
+    return CACHES[folder]
+
+def corpus_fingerprint(folder="./Data/"):
+    '''
+    Short hash of Faculty.csv and of the xml files in folder, it changes whenever one of them changes.
+    The hashes are taken from the cache when it is up to date
+    '''
+    cache = get_cache(folder)
+    digest = hashlib.sha1(file_hash("Faculty.csv").encode())
+    for name in sorted(list_names(folder)):
+        path = f"{folder.rstrip('/')}/{name}.xml"
+        entry = cache.get(path)
+        digest.update(path.encode())
+        digest.update((file_hash(path) if entry is None else entry['hash']).encode())
+    return digest.hexdigest()[:12]
+
+def load_records(xml_path):
+    '''
+    Reads every record of a file, None if the file could not be parsed
+    '''
+    try:
+        return list(iter_records(xml_path))
+    except Exception:
+        return None
+
+def iter_corpus(paths, workers=None, chunksize=None):
+    '''
+    Yields (path, records) for every path in order, the paths are files of a single folder.
+    Only the files that are not in the cache or changed since are parsed, over the process pool,
+    the records of a file are read or parsed when it is its turn so only the ones the caller keeps stay in memory
+    '''
+    paths = list(paths)
+    cache = get_cache(os.path.dirname(paths[0]) if paths else ".")
+    hits = {i for i in paths if cache.get(i) is not None}
+    parsed = parallel_iter(load_records, [i for i in paths if i not in hits], workers, chunksize)
+    for path in paths:
+        if path in hits:
+            try:
+                records = cache.load(path)
+            except Exception:
+                hits.discard(path)
+                records = load_records(path)
+                cache.put(path, records)
+        else:
+            records = next(parsed)
+            cache.put(path, records)
+        yield path, records
+
+    cache.close()
+    cache.hits += len(hits)
+    cache.misses += len(paths) - len(hits)
+    cache.save()
+    cache.report(len(hits), len(paths) - len(hits))
+
+def read_corpus(paths, workers=None, chunksize=None):
+    '''
+    Returns the records of every path, see iter_corpus
+    '''
+    return dict(iter_corpus(paths, workers, chunksize))
+
+def changed_years(folder, names):
+    '''
+    Years of the papers added, removed or edited in the files of names since they were cached.
+    The graphs of these years and the cumulative graphs after them are the ones a refresh recomputes
+    '''
+    cache = get_cache(folder)
+    years = set()
+    for name in names:
+        path = f"{folder.rstrip('/')}/{name}.xml"
+        try:
+            old = cache.load(path) or []
+        except Exception:
+            old = []
+        new = load_records(path) or []
+        key = lambda r: (r['tag'], r['title'], r['year'], tuple(r['authors']), r['crossref'])
+        years |= {i[2] for i in set(map(key, old)) ^ set(map(key, new))}
+    return sorted(i for i in years if i is not None)
+
+def get_people(workers=None, chunksize=None):
+    names = list_names("./AdditionalData")
+    paths = [f"./AdditionalData/{i}.xml" for i in names]
+    #Every person is scored at once from the venue and year columns once all of them are read
+    scoring = Corpus()
     hire = {}
-    for i in tqdm(names):
-        t = Person(i)
-        if t.store:
-            hire[i] = t 
+    for path, records in iter_corpus(paths, workers, chunksize):
+        i = os.path.basename(path)[:-len(".xml")]
+        if records is not None:
+            add_records(scoring, i, records, authors=False)
+            hire[i] = Person(i, records, 0)
+    rescore(hire, scoring.finalize(), PERSON_EXCELLENCE)
     return hire   
    
-def faculty_pid(name):
+def read_pid(name):
+    '''
+    Reads the pid on the root element without parsing the rest of the file
+    '''
     xml_path = f"./Data/{name}.xml"
-    xml = ET.parse(xml_path)
-    root=xml.getroot()
-    pid=root.attrib['pid']
-    FACULTY_PID[pid] = name
+    with open_source(xml_path) as file:
+        for _, root in ET.iterparse(file, events=("start",)):
+            return root.attrib['pid']
+
+def faculty_pid(name):
+    FACULTY_PID[read_pid(name)] = name
+
 
 def save_new_names():
     global ADDITIONAL_NAMES
@@ -243,25 +571,75 @@ def save_new_names():
     })
     temp.to_csv("Additional.csv",index = False)
 
-def getHire():
+def getHire(workers=None, chunksize=None):
     if('Additional.csv' not in os.listdir(".")):
         save_new_names()
         exit()
-    return get_people()
-
-def fetch_faculty():
-    faculty_names = (os.listdir("./Data"))
-    faculty_names = [i[:i.rfind(".")] for i in faculty_names]
+    return get_people(workers, chunksize)
+
+def build_corpus(owner_records, pid_names=None, authors=True):
+    '''
+    Builds the columnar Corpus from the records of every owner, the files that could not be read are left out.
+    With pid_names the authors are named after their pid like PublishedPaper does for the faculty,
+    without authors only the owner, year and venue columns are filled, which is enough for an Excellence rule.
+    owner_records is a dict or an iterable of (owner, records)
+    '''
+    corpus = Corpus()
+    if isinstance(owner_records, dict):
+        owner_records = owner_records.items()
+    for owner, records in owner_records:
+        if records is not None:
+            add_records(corpus, owner, records, pid_names, authors)
+    return corpus.finalize()
+
+def add_records(corpus, owner, records, pid_names=None, authors=True):
+    for record in records:
+        if not authors:
+            names = []
+        elif pid_names is None:
+            names = [name for name, pid in record['authors']]
+        else:
+            names = [pid_names.get(pid, name) for name, pid in record['authors']]
+        corpus.add_paper(owner, record['year'], PAPER_TYPES.get(record['tag']), conference(record['crossref']), names)
+
+def people_corpus(workers=None, chunksize=None):
+    '''
+    Corpus of the people in AdditionalData without building a Person for each of them
+    '''
+    names = list_names("./AdditionalData")
+    paths = [f"./AdditionalData/{i}.xml" for i in names]
+    records = iter_corpus(paths, workers, chunksize)
+    return build_corpus((os.path.basename(path)[:-len(".xml")], i) for path, i in records)
+
+def getHireCorpus(workers=None, chunksize=None):
+    if('Additional.csv' not in os.listdir(".")):
+        save_new_names()
+        exit()
+    return people_corpus(workers, chunksize)
+
+def load_faculty(workers=None, chunksize=None, papers=True):
+    '''
+    The Faculty of every name in Data, the names and the Corpus of the faculty, from a single read of the files.
+    Without papers the Faculty keep no PublishedPaper, the Corpus already holds every paper
+    '''
+    faculty_names = list_names("./Data")
     faculty = {}
+    for i, pid in zip(faculty_names, parallel_map(read_pid, faculty_names, workers, chunksize)):
+        FACULTY_PID[pid] = i
+    files = read_corpus([f"./Data/{i}.xml" for i in faculty_names], workers, chunksize)
+    records = {i: files[f"./Data/{i}.xml"] for i in faculty_names}
+    corpus = build_corpus(records, FACULTY_PID)
+    scores = FACULTY_EXCELLENCE.owner_scores(corpus, faculty_names)
     for i in faculty_names:
-        faculty_pid(i)
-    for i in faculty_names:
-        faculty[i] = Faculty(i)  
+        faculty[i] = Faculty(i, records[i] if papers else (), scores[i])
+    return faculty, faculty_names, corpus
+
+def fetch_faculty(workers=None, chunksize=None):
+    faculty, faculty_names, corpus = load_faculty(workers, chunksize)
     return faculty, faculty_names
 
 if __name__=="__main__":
-    faculty_names = (os.listdir("./Data"))
-    faculty_names = [i[:i.rfind(".")] for i in faculty_names]
+    faculty_names = list_names("./Data")
     faculty = {}
     for i in faculty_names:
         faculty[i] = Faculty(i)
\ No newline at end of file
@@ -1,17 +1,30 @@
 from preprocess import fetch_faculty
-from faculty import Year, Faculty
+from faculty import Year, Faculty, compute_years
 from interface import getApp as gp
 
 import argparse
 
 if __name__ == "__main__":  
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--eager", action="store_true", help="compute every year before starting the server")
+    parser.add_argument("--workers", type=int, default=None, help="processes used for the years with --eager, 0 for every core")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the spring layout")
+    parser.add_argument("--foreground", action="store_true", help="build every page before starting the server instead of in the background")
+    parser.add_argument("--pivots", type=int, default=None, help="sample the betweenness and closeness from this many pivots")
+    args = parser.parse_args()
+
+    approximate = None if args.pivots is None else {'k': args.pivots, 'seed': args.seed}
+
     year_graph = {}
 
     print("Building Year Dataset")
-    for i in range(2000,2022):
-        year_graph[i] = Year(i)
+    if args.eager:
+        year_graph = compute_years(range(2000,2022), args.workers, args.seed, approximate)
+    else:
+        for i in range(2000,2022):
+            year_graph[i] = Year(i, lazy=True, seed=args.seed, approximate=approximate)
 
-    app = gp(year_graph)
+    app = gp(year_graph, lazy=not args.eager, background=not args.foreground)
     app.run_server(debug=False)
 
 
@@ -0,0 +1,89 @@
+import argparse
+import importlib.util
+import os
+
+from preprocess import corpus_fingerprint
+from artifacts import ArtifactStore, ARTIFACTS_PATH
+
+
+def sampling(approximate=None):
+    '''
+    Name of the centrality sampling, exact without approximate
+    '''
+    if approximate is None:
+        return "exact"
+    return "-".join(f"{key}{approximate[key]}" for key in sorted(approximate))
+
+
+def artifact_path(seed=None, approximate=None):
+    '''
+    Directory of the pages built from the current Data, AdditionalData and Faculty.csv with the layout seed and
+    the centrality sampling, a change to any of them gives a new directory and the pages are built again
+    '''
+    corpus = f"{corpus_fingerprint()}-{corpus_fingerprint('./AdditionalData/')}"
+    return os.path.join(ARTIFACTS_PATH, f"{corpus}-seed{seed}-{sampling(approximate)}")
+
+
+def build(seed=None, approximate=None, workers=None):
+    '''
+    Renders every page once into the artifact store, the years are computed over the process pool
+    '''
+    import interface
+    from faculty import compute_years
+
+    interface.ARTIFACTS = ArtifactStore(artifact_path(seed, approximate))
+    years = compute_years(range(2000, 2022), workers, seed, approximate)
+    interface.getApp(years, lazy=False, background=False)
+    for i in range(2000, 2022):
+        interface.render_rank_year_graph(i)
+    print(f"Pages written to {interface.ARTIFACTS.path}")
+
+
+def create_server(seed=None, approximate=None):
+    '''
+    Flask server of a serving process, the pages are read from the store written by build.
+    Also the entry point for gunicorn: gunicorn -w 4 "serve:create_server()", NS_SEED and NS_PIVOTS give the seed
+    and the pivots of the build. NS_PAGES is the store found by the master, the workers then do not hash the corpus again.
+    The Year of a year is only built when one of its pages is missing from the store
+    '''
+    import interface
+    from faculty import LazyYears
+
+    if seed is None and os.environ.get("NS_SEED"):
+        seed = int(os.environ["NS_SEED"])
+    if approximate is None and os.environ.get("NS_PIVOTS"):
+        approximate = {'k': int(os.environ["NS_PIVOTS"]), 'seed': seed}
+    path = os.environ.get("NS_PAGES") or artifact_path(seed, approximate)
+    if not os.path.isdir(path):
+        print(f"No pages in {path}, run 'python serve.py build' first, they are built by every process until then")
+    interface.ARTIFACTS = ArtifactStore(path, writable=False)
+
+    years = LazyYears(range(2000, 2022), seed, approximate)
+    return interface.getApp(years, background=False).server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the pages once and serves them from several processes")
+    parser.add_argument("command", choices=["build", "run"])
+    parser.add_argument("--seed", type=int, default=None, help="seed of the spring layout")
+    parser.add_argument("--pivots", type=int, default=None, help="sample the betweenness and closeness from this many pivots, give the same value to build and run")
+    parser.add_argument("--workers", type=int, default=None, help="processes used for the years by build, 0 for every core")
+    parser.add_argument("--processes", type=int, default=4, help="server processes started by run")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+
+    approximate = None if args.pivots is None else {'k': args.pivots, 'seed': args.seed}
+    if args.command == "build":
+        build(args.seed, approximate, args.workers)
+    elif importlib.util.find_spec("gunicorn") is not None:
+        if args.seed is not None:
+            os.environ["NS_SEED"] = str(args.seed)
+        if args.pivots is not None:
+            os.environ["NS_PIVOTS"] = str(args.pivots)
+        os.environ["NS_PAGES"] = artifact_path(args.seed, approximate)
+        os.execvp("gunicorn", ["gunicorn", "-w", str(args.processes), "-b", f"{args.host}:{args.port}", "serve:create_server()"])
+    else:
+        #Without gunicorn werkzeug forks a process per request, the pages are still read from the shared files
+        print("gunicorn is not installed, using the forking werkzeug server")
+        create_server(args.seed, approximate).run(host=args.host, port=args.port, processes=args.processes, threaded=False)